@@ -0,0 +1,92 @@
+import random
+from typing import Iterator
+
+from tesla_client.vehicle_data_pb2 import (  # type: ignore
+    Datum,
+    DetailedChargeStateValue,
+    Field,
+    HvacPowerState,
+    LocationValue,
+    Payload,
+    ShiftState,
+    Value,
+)
+
+
+NUMERIC_FIELDS = [
+    Field.BatteryLevel,
+    Field.EstBatteryRange,
+    Field.ChargeLimitSoc,
+    Field.TimeToFullCharge,
+    Field.InsideTemp,
+    Field.OutsideTemp,
+    Field.MinutesToArrival,
+    Field.GpsHeading,
+    Field.VehicleSpeed,
+    Field.Location,
+    Field.DestinationLocation,
+]
+
+ENUM_FIELDS = [
+    Field.DetailedChargeState,
+    Field.HvacPower,
+    Field.Gear,
+    Field.FastChargerPresent,
+    Field.Locked,
+    Field.LocatedAtHome,
+    Field.DestinationName,
+]
+
+
+def make_vins(count: int) -> list[str]:
+    return [f'5YJ3E1EA7HF{i:06d}' for i in range(count)]
+
+
+def make_value(field: int, rng: random.Random) -> Value:
+    if field in (Field.Location, Field.DestinationLocation):
+        return Value(location_value=LocationValue(
+            latitude=rng.uniform(32.0, 42.0),
+            longitude=rng.uniform(-124.0, -114.0),
+        ))
+    elif field == Field.ChargeLimitSoc:
+        return Value(int_value=rng.randint(50, 100))
+    elif field == Field.DetailedChargeState:
+        return Value(detailed_charge_state_value=rng.choice(DetailedChargeStateValue.values()))
+    elif field == Field.HvacPower:
+        return Value(hvac_power_value=rng.choice(HvacPowerState.values()))
+    elif field == Field.Gear:
+        return Value(shift_state_value=rng.choice(ShiftState.values()))
+    elif field in (Field.FastChargerPresent, Field.Locked, Field.LocatedAtHome):
+        return Value(boolean_value=rng.random() < 0.5)
+    elif field == Field.DestinationName:
+        return Value(string_value=rng.choice(['Home', 'Work', 'Supercharger', '']))
+    else:
+        return Value(double_value=rng.uniform(0.0, 100.0))
+
+
+def generate_payloads(
+    vin_count: int = 100,
+    fields_per_payload: int = 5,
+    enum_ratio: float = 0.5,
+    seed: int = 0,
+) -> Iterator[Payload]:
+    """
+    Endlessly yield synthetic Payloads round-robin over vin_count vehicles.
+
+    - enum_ratio is the share of each payload's fields drawn from ENUM_FIELDS
+      (enums, booleans, strings); the rest are drawn from NUMERIC_FIELDS
+    """
+    rng = random.Random(seed)
+    vins = make_vins(vin_count)
+    enum_count = min(round(fields_per_payload * enum_ratio), len(ENUM_FIELDS))
+    numeric_count = min(fields_per_payload - enum_count, len(NUMERIC_FIELDS))
+
+    while True:
+        for vin in vins:
+            fields = rng.sample(ENUM_FIELDS, enum_count) + rng.sample(NUMERIC_FIELDS, numeric_count)
+            payload = Payload(
+                vin=vin,
+                data=[Datum(key=field, value=make_value(field, rng)) for field in fields],
+            )
+            payload.created_at.GetCurrentTime()
+            yield payload
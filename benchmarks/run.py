@@ -0,0 +1,318 @@
+"""
+Benchmark suite for the telemetry hot path and the API client.
+
+    python -m benchmarks.run [--output results.json] [--only NAME ...] [--corpus LOG_DIR]
+
+With --corpus, payload decode and handle_vehicle_message are also measured over Payloads
+recorded by tesla_client.telemetry_log.TelemetryRecorder.
+
+Results are written as JSON so that runs can be diffed between releases.
+"""
+import argparse
+import itertools
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from importlib import metadata
+from typing import Any
+from typing import Callable
+from typing import TYPE_CHECKING
+
+from tesla_client.account import Account
+from tesla_client.telemetry_log import TelemetryLogReader
+from tesla_client.vehicle import Vehicle
+from tesla_client.vehicle_data_pb2 import Payload  # type: ignore
+
+from .payloads import generate_payloads
+from .payloads import make_vins
+from .stub_server import StubServer
+
+
+if TYPE_CHECKING:
+    from tesla_client.fleet_telemetry import FleetTelemetryListener
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    params: dict[str, Any]
+    iterations: int
+    seconds: float
+    ops_per_sec: float
+    mean_us: float
+    p50_us: float
+    p99_us: float
+    extra: dict[str, Any] = field(default_factory=dict)
+
+
+class BenchmarkSkipped(Exception):
+    pass
+
+
+def import_listener() -> type['FleetTelemetryListener']:
+    # imported lazily so that the other benchmarks run without a working kafka install
+    try:
+        from tesla_client.fleet_telemetry import FleetTelemetryListener as listener_cls
+    except (ImportError, SyntaxError) as ex:
+        raise BenchmarkSkipped(f'cannot import tesla_client.fleet_telemetry: {type(ex).__name__}: {ex}') from ex
+    return listener_cls
+
+
+class BenchmarkAccount(Account):
+    def get_fresh_access_token(self) -> str:
+        return 'bEnCHmARKtOKEN'
+
+
+def measure(
+    name: str,
+    params: dict[str, Any],
+    op: Callable[[], Any],
+    iterations: int,
+    batch_size: int = 1,
+) -> BenchmarkResult:
+    """
+    Time iterations // batch_size batches of batch_size calls to op. Per-op latencies
+    are derived per batch, which keeps timer overhead out of sub-microsecond ops.
+    """
+    batches = max(iterations // batch_size, 1)
+    per_op_us = []
+
+    start = time.perf_counter()
+    for _ in range(batches):
+        t0 = time.perf_counter()
+        for _ in range(batch_size):
+            op()
+        per_op_us.append((time.perf_counter() - t0) * 1e6 / batch_size)
+    seconds = time.perf_counter() - start
+
+    total = batches * batch_size
+    per_op_us.sort()
+    return BenchmarkResult(
+        name=name,
+        params=params,
+        iterations=total,
+        seconds=seconds,
+        ops_per_sec=total / seconds,
+        mean_us=statistics.fmean(per_op_us),
+        p50_us=per_op_us[len(per_op_us) // 2],
+        p99_us=per_op_us[min(int(len(per_op_us) * 0.99), len(per_op_us) - 1)],
+    )
+
+
+def make_loaded_vehicle(account: Account, vin: str) -> Vehicle:
+    vehicle = account.vehicle_cls(account, {'vin': vin, 'display_name': vin, 'state': 'online'})
+    now = int(time.time())
+    vehicle.set_cached_vehicle_data({
+        'charge_state': {
+            'battery_level': 80.0,
+            'battery_range': 250.0,
+            'charge_limit_soc': 90,
+            'charging_state': 'Disconnected',
+            'fast_charger_present': False,
+            'time_to_full_charge': 0.0,
+        },
+        'climate_state': {'inside_temp': 70.0, 'is_climate_on': False, 'outside_temp': 60.0},
+        'drive_state': {
+            'active_route_destination': '',
+            'active_route_latitude': 0.0,
+            'active_route_longitude': 0.0,
+            'active_route_minutes_to_arrival': 0.0,
+            'heading': 0.0,
+            'latitude': 37.0,
+            'longitude': -122.0,
+            'shift_state': 'P',
+            'speed': 0.0,
+        },
+        'vehicle_state': {'locked': True, 'vehicle_name': vin},
+        'location': {'located_at_home': None},
+        'last_update': now,
+        'last_load_from_api': now,
+    })
+    return vehicle
+
+
+PAYLOAD_MIXES: list[dict[str, Any]] = [
+    {'vin_count': 100, 'fields_per_payload': 5, 'enum_ratio': 0.8},
+    {'vin_count': 100, 'fields_per_payload': 5, 'enum_ratio': 0.2},
+    {'vin_count': 1000, 'fields_per_payload': 15, 'enum_ratio': 0.5},
+]
+
+
+def bench_decode(iterations: int) -> list[BenchmarkResult]:
+    results = []
+    for mix in PAYLOAD_MIXES:
+        raw = [
+            p.SerializeToString()
+            for p in itertools.islice(generate_payloads(**mix), mix['vin_count'])
+        ]
+        cycle = itertools.cycle(raw)
+        result = measure(
+            'payload_decode',
+            mix,
+            lambda: Payload.FromString(next(cycle)),
+            iterations,
+            batch_size=100,
+        )
+        result.extra['mean_payload_bytes'] = statistics.fmean(len(r) for r in raw)
+        results.append(result)
+    return results
+
+
+def bench_handle_vehicle_message(iterations: int) -> list[BenchmarkResult]:
+    listener_cls = import_listener()
+
+    results = []
+    account = BenchmarkAccount()
+    for mix in PAYLOAD_MIXES:
+        listener = listener_cls(
+            [make_loaded_vehicle(account, vin) for vin in make_vins(mix['vin_count'])],
+            load_vehicles=False,
+        )
+        payloads = list(itertools.islice(generate_payloads(**mix), mix['vin_count'] * 10))
+        cycle = itertools.cycle(payloads)
+        results.append(measure(
+            'handle_vehicle_message',
+            mix,
+            lambda: listener.handle_vehicle_message(next(cycle)),
+            iterations,
+            batch_size=10,
+        ))
+    return results
+
+
+def bench_corpus(corpus: str, iterations: int) -> list[BenchmarkResult]:
+    listener_cls = import_listener()
+
+    with TelemetryLogReader(corpus) as reader:
+        raw = [r for _, r in reader.read()]
+    if not raw:
+        return []
+
+    payloads = [Payload.FromString(r) for r in raw]
+    params = {'corpus': corpus, 'payloads': len(raw)}
+
+    raw_cycle = itertools.cycle(raw)
+    decode_result = measure(
+        'corpus_payload_decode',
+        params,
+        lambda: Payload.FromString(next(raw_cycle)),
+        iterations,
+        batch_size=100,
+    )
+    decode_result.extra['mean_payload_bytes'] = statistics.fmean(len(r) for r in raw)
+
+    account = BenchmarkAccount()
+    listener = listener_cls(
+        [make_loaded_vehicle(account, vin) for vin in {p.vin for p in payloads}],
+        load_vehicles=False,
+    )
+    payload_cycle = itertools.cycle(payloads)
+    handle_result = measure(
+        'corpus_handle_vehicle_message',
+        params,
+        lambda: listener.handle_vehicle_message(next(payload_cycle)),
+        iterations,
+        batch_size=10,
+    )
+
+    return [decode_result, handle_result]
+
+
+def bench_vehicle_getters(iterations: int) -> list[BenchmarkResult]:
+    vehicle = make_loaded_vehicle(BenchmarkAccount(), make_vins(1)[0])
+    getters = {
+        'get_charge_state': vehicle.get_charge_state,
+        'get_climate_state': vehicle.get_climate_state,
+        'get_drive_state': vehicle.get_drive_state,
+        'get_vehicle_state': vehicle.get_vehicle_state,
+        'is_located_at_home': vehicle.is_located_at_home,
+    }
+    return [
+        measure('vehicle_getter', {'getter': name}, getter, iterations, batch_size=100)
+        for name, getter in getters.items()
+    ]
+
+
+def bench_api_client(iterations: int) -> list[BenchmarkResult]:
+    results = []
+    with StubServer() as server:
+        client = BenchmarkAccount(api_host=server.url).client
+        vin = make_vins(1)[0]
+        ops = {
+            'api_get': lambda: client.api_get(f'/api/1/vehicles/{vin}/vehicle_data'),
+            'api_post': lambda: client.api_post(f'/api/1/vehicles/{vin}/command/honk_horn', json={}),
+            'api_delete': lambda: client.api_delete(f'/api/1/vehicles/{vin}/fleet_telemetry_config'),
+        }
+        for name, op in ops.items():
+            # the stub round trip dominates; cap iterations so the suite stays quick
+            results.append(measure('api_client', {'method': name}, op, min(iterations, 500)))
+    return results
+
+
+BENCHMARKS: dict[str, Callable[[int], list[BenchmarkResult]]] = {
+    'decode': bench_decode,
+    'handle_vehicle_message': bench_handle_vehicle_message,
+    'vehicle_getters': bench_vehicle_getters,
+    'api_client': bench_api_client,
+}
+
+
+def get_version() -> str | None:
+    try:
+        return metadata.version('tesla-client')
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help='run only these benchmarks')
+    parser.add_argument('--iterations', type=int, default=10000)
+    parser.add_argument('--corpus', help='telemetry log directory to benchmark recorded Payloads from')
+    args = parser.parse_args(argv)
+
+    # the hot path logs every message; keep log formatting from dominating the numbers
+    logging.disable(logging.INFO)
+
+    results: list[BenchmarkResult] = []
+    skipped: dict[str, str] = {}
+    for name in args.only or BENCHMARKS:
+        try:
+            results.extend(BENCHMARKS[name](args.iterations))
+        except BenchmarkSkipped as ex:
+            skipped[name] = str(ex)
+    if args.corpus:
+        try:
+            results.extend(bench_corpus(args.corpus, args.iterations))
+        except BenchmarkSkipped as ex:
+            skipped['corpus'] = str(ex)
+
+    report = {
+        'meta': {
+            'tesla_client_version': get_version(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'timestamp': int(time.time()),
+            'iterations': args.iterations,
+            'skipped': skipped,
+        },
+        'results': [asdict(r) for r in results],
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
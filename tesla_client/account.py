@@ -1,18 +1,49 @@
+import json
+import logging
 from abc import ABC
 from abc import abstractmethod
+from collections import defaultdict
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
 
 from .client import APIClient
 from .client import HOST
+from .client import RetryPolicy
+from .vehicle import FleetTelemetryStatus
 from .vehicle import Vehicle
 from .vehicle import VehicleNotFoundError
 
 
+FLEET_TELEMETRY_CHUNK_SIZE = 100
+
+
+@dataclass
+class FleetTelemetryReconcileResult:
+    """
+    - skipped_vins maps a VIN the API refused to configure to the reason, e.g. missing_key
+    - failed_vins maps a VIN whose request raised to the error; its config is unknown
+    """
+    updated_vins: list[str] = field(default_factory=list)
+    unpaired_vins: list[str] = field(default_factory=list)
+    unchanged_vins: list[str] = field(default_factory=list)
+    skipped_vins: dict[str, str] = field(default_factory=dict)
+    failed_vins: dict[str, str] = field(default_factory=dict)
+
+
+def is_fleet_telemetry_config_current(desired: dict[str, Any] | None, current: dict[str, Any] | None) -> bool:
+    if desired is None or current is None:
+        return desired is None and current is None
+    # the API may return keys we never set, so only compare the ones we did
+    return all(current.get(k) == v for k, v in desired.items())
+
+
 class Account(ABC):
     client: APIClient
     vehicle_cls: type[Vehicle] = Vehicle
 
-    def __init__(self, api_host: str = HOST) -> None:
-        self.client = APIClient(self, api_host)
+    def __init__(self, api_host: str = HOST, retry_policy: RetryPolicy | None = None) -> None:
+        self.client = APIClient(self, api_host, retry_policy)
 
     @abstractmethod
     def get_fresh_access_token(self) -> str:
@@ -34,3 +65,131 @@ class Account(ABC):
         if not vehicle:
             raise VehicleNotFoundError
         return vehicle
+
+    def get_fleet_telemetry_configs(self, vins: list[str]) -> dict[str, dict[str, Any] | None]:
+        return {
+            vin: self.client.api_get(
+                f'/api/1/vehicles/{vin}/fleet_telemetry_config',
+            ).json()['response']['config'] or None
+            for vin in vins
+        }
+
+    def refresh_fleet_telemetry_statuses(
+        self,
+        vehicles: list[Vehicle],
+        vin_to_paired: dict[str, bool] | None = None,
+    ) -> None:
+        """
+        Refresh the FleetTelemetryStatus of many vehicles with one fleet_status call per
+        chunk. Pairing is read from vin_to_paired when given, instead of fetching each
+        vehicle's fleet_telemetry_config.
+        """
+        if vin_to_paired is None:
+            vin_to_paired = {
+                vin: config is not None
+                for vin, config in self.get_fleet_telemetry_configs([v.vin for v in vehicles]).items()
+            }
+
+        for i in range(0, len(vehicles), FLEET_TELEMETRY_CHUNK_SIZE):
+            chunk = vehicles[i:i + FLEET_TELEMETRY_CHUNK_SIZE]
+            fleet_status = self.client.api_post(
+                '/api/1/vehicles/fleet_status',
+                json={'vins': [v.vin for v in chunk]},
+            ).json()['response']
+
+            key_paired_vins = set(fleet_status['key_paired_vins'])
+            for vehicle in chunk:
+                vehicle.set_fleet_telemetry_status(
+                    FleetTelemetryStatus(
+                        virtual_key_required=fleet_status['vehicle_info'][vehicle.vin]['vehicle_command_protocol_required'],
+                        virtual_key_added=vehicle.vin in key_paired_vins,
+                        fleet_telemetry_paired=vin_to_paired[vehicle.vin],
+                    )
+                )
+
+    def reconcile_fleet_telemetry(
+        self,
+        vehicles: list[Vehicle],
+        vin_to_desired_config: dict[str, dict[str, Any] | None],
+        vin_to_current_config: dict[str, dict[str, Any] | None] | None = None,
+        refresh_statuses: bool = True,
+    ) -> FleetTelemetryReconcileResult:
+        """
+        Bring each vehicle's fleet telemetry config to its desired config (None to unpair).
+
+        VINs whose configs differ are grouped by identical desired config and sent in
+        batched fleet_telemetry_config calls of up to FLEET_TELEMETRY_CHUNK_SIZE VINs.
+        Current configs are fetched per vehicle unless vin_to_current_config is given.
+        A failing config fetch, delete or chunk only fails its own VINs, in failed_vins.
+
+        Afterwards, statuses are refreshed in bulk. Pairing is taken from the results rather
+        than re-read: updated and unpaired VINs are assumed to have their desired config,
+        and skipped and failed VINs to have kept their current one. Vehicles whose current
+        config could not be fetched keep their status.
+        """
+        result = FleetTelemetryReconcileResult()
+        vehicles = [v for v in vehicles if v.vin in vin_to_desired_config]
+        vins = [v.vin for v in vehicles]
+        if vin_to_current_config is None:
+            vin_to_current_config = {}
+            for vin in vins:
+                try:
+                    vin_to_current_config.update(self.get_fleet_telemetry_configs([vin]))
+                except Exception as ex:
+                    logging.exception(f'Failed to fetch fleet telemetry config for vehicle {vin}')
+                    result.failed_vins[vin] = repr(ex)
+
+        config_key_to_vins: defaultdict[str, list[str]] = defaultdict(list)
+        for vin in vins:
+            if vin in result.failed_vins:
+                continue
+            desired = vin_to_desired_config[vin]
+            current = vin_to_current_config.get(vin)
+            if is_fleet_telemetry_config_current(desired, current):
+                result.unchanged_vins.append(vin)
+            elif desired is None:
+                # the API has no batch delete
+                try:
+                    self.client.api_delete(f'/api/1/vehicles/{vin}/fleet_telemetry_config')
+                except Exception as ex:
+                    logging.exception(f'Failed to unpair fleet telemetry for vehicle {vin}')
+                    result.failed_vins[vin] = repr(ex)
+                    continue
+                result.unpaired_vins.append(vin)
+            else:
+                config_key_to_vins[json.dumps(desired, sort_keys=True)].append(vin)
+
+        for config_key, config_vins in config_key_to_vins.items():
+            config = json.loads(config_key)
+            for i in range(0, len(config_vins), FLEET_TELEMETRY_CHUNK_SIZE):
+                chunk = config_vins[i:i + FLEET_TELEMETRY_CHUNK_SIZE]
+                try:
+                    response = self.client.api_post(
+                        '/api/1/vehicles/fleet_telemetry_config',
+                        json={'config': config, 'vins': chunk},
+                    ).json()['response']
+                except Exception as ex:
+                    logging.exception(f'Failed to configure fleet telemetry for {len(chunk)} vehicles')
+                    result.failed_vins.update((vin, repr(ex)) for vin in chunk)
+                    continue
+
+                for reason, skipped_vins in (response.get('skipped_vehicles') or {}).items():
+                    for vin in skipped_vins:
+                        result.skipped_vins[vin] = reason
+                result.updated_vins.extend(vin for vin in chunk if vin not in result.skipped_vins)
+
+        if refresh_statuses:
+            vehicles = [v for v in vehicles if v.vin in vin_to_current_config or v.vin not in result.failed_vins]
+            self.refresh_fleet_telemetry_statuses(
+                vehicles,
+                {
+                    v.vin: (
+                        vin_to_current_config.get(v.vin) is not None
+                        if v.vin in result.skipped_vins or v.vin in result.failed_vins
+                        else vin_to_desired_config[v.vin] is not None
+                    )
+                    for v in vehicles
+                },
+            )
+
+        return result
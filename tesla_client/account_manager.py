@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .account import Account
+from .client import RateLimiter
+from .vehicle import Vehicle
+from .vehicle import VehicleNotFoundError
+
+
+@dataclass
+class AccountEntry:
+    account: Account
+    last_used: float
+    vehicles: list[Vehicle] | None = None
+    vehicles_loaded_at: float = 0.0
+    vehicles_lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class AccountManager:
+    """
+    Hosts many Accounts in one process. All accounts share one connection pool (through one
+    HTTPAdapter) and one rate limiter, while each keeps its own access token and its own
+    Session, so cookies never leak between accounts.
+
+    Accounts are created on first use by account_factory, and their tokens and vehicle
+    lists are only fetched when needed. Per account, the manager holds nothing but the
+    Account and its vehicle list; accounts idle for idle_timeout seconds, or beyond the
+    max_accounts most recently used, are evicted.
+    """
+    account_factory: Callable[[str], Account]
+    max_accounts: int
+    idle_timeout: float
+    vehicles_ttl: float
+    adapter: HTTPAdapter
+    rate_limiter: RateLimiter | None
+
+    def __init__(
+        self,
+        account_factory: Callable[[str], Account],
+        max_accounts: int = 1000,
+        idle_timeout: float = 60 * 60,
+        vehicles_ttl: float = 5 * 60,
+        rate_limiter: RateLimiter | None = None,
+        pool_maxsize: int = 100,
+    ) -> None:
+        self.account_factory = account_factory
+        self.max_accounts = max_accounts
+        self.idle_timeout = idle_timeout
+        self.vehicles_ttl = vehicles_ttl
+        self.rate_limiter = rate_limiter
+
+        self.adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+
+        self._lock = threading.Lock()
+        self._account_id_to_entry: OrderedDict[str, AccountEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._account_id_to_entry)
+
+    def __contains__(self, account_id: str) -> bool:
+        return account_id in self._account_id_to_entry
+
+    def get_account(self, account_id: str) -> Account:
+        return self._get_entry(account_id).account
+
+    def get_vehicles(self, account_id: str) -> list[Vehicle]:
+        entry = self._get_entry(account_id)
+
+        # one refresh per account at a time; concurrent callers wait for it instead of
+        # each fetching the same list
+        with entry.vehicles_lock:
+            if entry.vehicles is None or time.monotonic() - entry.vehicles_loaded_at > self.vehicles_ttl:
+                entry.vehicles = entry.account.get_vehicles()
+                entry.vehicles_loaded_at = time.monotonic()
+
+            return entry.vehicles
+
+    def get_vehicle_by_vin(self, account_id: str, vin: str) -> Vehicle:
+        for vehicle in self.get_vehicles(account_id):
+            if vehicle.vin == vin:
+                return vehicle
+        raise VehicleNotFoundError
+
+    def evict(self, account_id: str) -> None:
+        with self._lock:
+            self._account_id_to_entry.pop(account_id, None)
+
+    def _get_entry(self, account_id: str) -> AccountEntry:
+        entry = self._use_entry(account_id)
+        if entry:
+            return entry
+
+        # account_factory may be slow, so it runs outside the lock; if another thread
+        # created the same account meanwhile, its entry wins
+        entry = self._use_entry(account_id, self._make_account(account_id))
+        assert entry is not None
+        return entry
+
+    def _use_entry(self, account_id: str, new_account: Account | None = None) -> AccountEntry | None:
+        """
+        Mark account_id's entry as most recently used, adding one for new_account if there is none
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._account_id_to_entry.get(account_id)
+            if entry:
+                entry.last_used = now
+                self._account_id_to_entry.move_to_end(account_id)
+            elif new_account:
+                entry = AccountEntry(account=new_account, last_used=now)
+                self._account_id_to_entry[account_id] = entry
+
+            self._evict_stale(now)
+
+        return entry
+
+    def _make_account(self, account_id: str) -> Account:
+        account = self.account_factory(account_id)
+        session = requests.Session()
+        session.mount('https://', self.adapter)
+        session.mount('http://', self.adapter)
+        account.client.session = session
+        account.client.rate_limiter = self.rate_limiter
+        return account
+
+    def _evict_stale(self, now: float) -> None:
+        # entries are kept in least to most recently used order
+        while self._account_id_to_entry:
+            oldest_id, oldest_entry = next(iter(self._account_id_to_entry.items()))
+            if len(self._account_id_to_entry) > self.max_accounts or now - oldest_entry.last_used > self.idle_timeout:
+                del self._account_id_to_entry[oldest_id]
+            else:
+                break
@@ -1,6 +1,13 @@
 from typing import TYPE_CHECKING
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
 import requests
 from requests.models import Response
+from urllib3.exceptions import NewConnectionError
 
 
 if TYPE_CHECKING:
@@ -9,6 +16,14 @@ if TYPE_CHECKING:
 
 HOST = 'https://fleet-api.prd.na.vn.cloud.tesla.com'
 
+VIN_ENDPOINT_RE = re.compile(r'/api/1/vehicles/([^/]+)/')
+
+# methods that are safe to resend after a request may have reached the server
+IDEMPOTENT_METHODS = frozenset({'GET', 'DELETE'})
+
+# statuses meaning the server did not process the request, so any method may be resent
+UNPROCESSED_STATUSES = frozenset({429, 503})
+
 
 class AuthenticationError(Exception):
     pass
@@ -18,41 +33,174 @@ class VehicleAsleepError(Exception):
     pass
 
 
+class ServerError(requests.HTTPError):
+    pass
+
+
+class RateLimitedError(requests.HTTPError):
+    pass
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+@dataclass
+class RetryPolicy:
+    """
+    - delays are in seconds; retry n waits a random time up to min(max_delay, base_delay * 2 ** n)
+    - deadline bounds the time spent on one request across all of its retries; each attempt's
+      timeout is cut to the time left before it
+    - connection errors, timeouts and retry_statuses are retried for GET and DELETE; commands
+      are not idempotent, so POST is only retried when it was never sent (connect failures)
+      or was refused unprocessed (429, 503)
+    - 408 means the vehicle is asleep and is never retried here; callers wake the vehicle instead
+    - a vehicle's circuit opens after circuit_failure_threshold failures in a row within
+      circuit_failure_window, and requests for it then fail fast for circuit_reset_timeout
+    """
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    deadline: float = 60.0
+    request_timeout: float | None = 30.0
+    retry_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    retry_connection_errors: bool = True
+    wake_attempts: int = 3
+    wake_delay: tuple[float, float] = (2.0, 10.0)
+    circuit_failure_threshold: int = 5
+    circuit_failure_window: float = 300.0
+    circuit_reset_timeout: float = 60.0
+
+    def get_delay(self, attempt: int, retry_after: float | None = None) -> float:
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class RateLimiter:
+    """
+    Token bucket allowing rate requests per second with bursts of up to burst requests.
+    Thread-safe, so one instance can be shared by many APIClients.
+    """
+    rate: float
+    burst: int
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    policy: RetryPolicy
+
+    def __init__(self, policy: RetryPolicy) -> None:
+        self.policy = policy
+        self._lock = threading.Lock()
+        self._key_to_failure_times: dict[str, deque[float]] = {}
+        self._key_to_opened_at: dict[str, float] = {}
+
+    def check(self, key: str) -> None:
+        opened_at = self._key_to_opened_at.get(key)
+        if opened_at is not None and time.monotonic() - opened_at < self.policy.circuit_reset_timeout:
+            raise CircuitOpenError(key)
+
+    def record_success(self, key: str) -> None:
+        # only consecutive failures count towards opening the circuit
+        with self._lock:
+            self._key_to_opened_at.pop(key, None)
+            self._key_to_failure_times.pop(key, None)
+
+    def record_failure(self, key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if key in self._key_to_opened_at:
+                # a trial request after circuit_reset_timeout failed
+                self._key_to_opened_at[key] = now
+                return
+
+            failure_times = self._key_to_failure_times.setdefault(key, deque())
+            failure_times.append(now)
+            while failure_times[0] < now - self.policy.circuit_failure_window:
+                failure_times.popleft()
+
+            if len(failure_times) >= self.policy.circuit_failure_threshold:
+                self._key_to_opened_at[key] = now
+
+
+def get_retry_after(resp: Response) -> float | None:
+    try:
+        return float(resp.headers['Retry-After'])
+    except (KeyError, ValueError):
+        return None
+
+
+def is_request_unsent(ex: requests.RequestException) -> bool:
+    """
+    Whether the request failed before reaching the server, so resending it cannot repeat it
+    """
+    if isinstance(ex, requests.ConnectTimeout):
+        return True
+    reason = getattr(ex.args[0], 'reason', None) if ex.args else None
+    return isinstance(reason, NewConnectionError)
+
+
 class APIClient:
+    """
+    - the access token is fetched from the account on first use and again on 401/403
+    - session and rate_limiter may be replaced with instances shared by many clients
+    """
     account: 'Account'
-    access_token: str
     api_host: str
+    retry_policy: RetryPolicy
+    circuit_breaker: CircuitBreaker
+    session: requests.Session
+    rate_limiter: RateLimiter | None
+    _access_token: str | None
 
-    def __init__(self, account: 'Account', api_host: str = HOST) -> None:
+    def __init__(
+        self,
+        account: 'Account',
+        api_host: str = HOST,
+        retry_policy: RetryPolicy | None = None,
+    ) -> None:
         self.account = account
         self.api_host = api_host
-        self.access_token = self.account.get_fresh_access_token()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = CircuitBreaker(self.retry_policy)
+        self.session = requests.Session()
+        self.rate_limiter = None
+        self._access_token = None
 
-    def api_get(self, endpoint: str, is_retry: bool = False) -> Response:
-        resp = requests.get(
-            self.api_host + endpoint,
-            headers={
-                'Authorization': 'Bearer ' + self.access_token,
-                'Content-type': 'application/json',
-            },
-            verify=False,
-        )
-
-        try:
-            resp.raise_for_status()
-        except requests.HTTPError as ex:
-            if ex.response.status_code in (401, 403):
-                if is_retry:
-                    raise AuthenticationError
-                else:
-                    self.access_token = self.account.get_fresh_access_token()
-                    return self.api_get(endpoint, is_retry=True)
-            elif ex.response.status_code == 408:
-                raise VehicleAsleepError
-            else:
-                raise
+    @property
+    def access_token(self) -> str:
+        if self._access_token is None:
+            self._access_token = self.account.get_fresh_access_token()
+        return self._access_token
 
-        return resp
+    @access_token.setter
+    def access_token(self, access_token: str) -> None:
+        self._access_token = access_token
+
+    def api_get(self, endpoint: str, is_retry: bool = False) -> Response:
+        return self._request('GET', endpoint, is_retry=is_retry)
 
     def api_post(
         self,
@@ -61,54 +209,108 @@ class APIClient:
         json: dict | None = None,
         host_override: str | None = None,
     ) -> Response:
+        return self._request('POST', endpoint, is_retry=is_retry, json=json, host_override=host_override)
+
+    def api_delete(
+        self,
+        endpoint: str,
+    ) -> Response:
+        return self._request('DELETE', endpoint)
+
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        is_retry: bool = False,
+        json: dict | None = None,
+        host_override: str | None = None,
+    ) -> Response:
+        policy = self.retry_policy
         host = host_override or self.api_host
+        deadline = time.monotonic() + policy.deadline
+
+        vin_match = VIN_ENDPOINT_RE.match(endpoint)
+        vin = vin_match.group(1) if vin_match else None
+        if vin:
+            self.circuit_breaker.check(vin)
+
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
 
-        resp = requests.post(
-            host + endpoint,
-            headers={
-                'Authorization': 'Bearer ' + self.access_token,
-                'Content-type': 'application/json',
-            },
-            json=json,
-            verify=False,
-        )
-
-        try:
-            resp.raise_for_status()
-        except requests.HTTPError as ex:
-            if ex.response.status_code in (401, 403):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise requests.Timeout(f'Deadline of {policy.deadline}s exceeded for {method} {endpoint}')
+            timeout = remaining if policy.request_timeout is None else min(policy.request_timeout, remaining)
+
+            try:
+                resp = self.session.request(
+                    method,
+                    host + endpoint,
+                    headers={
+                        'Authorization': 'Bearer ' + self.access_token,
+                        'Content-type': 'application/json',
+                    },
+                    json=json,
+                    timeout=timeout,
+                    verify=False,
+                )
+            except (requests.ConnectionError, requests.Timeout) as ex:
+                is_retryable = method in IDEMPOTENT_METHODS or is_request_unsent(ex)
+                if policy.retry_connection_errors and is_retryable and self._sleep_before_retry(attempt, deadline):
+                    attempt += 1
+                    continue
+                if vin:
+                    self.circuit_breaker.record_failure(vin)
+                raise
+
+            status_code = resp.status_code
+
+            if status_code in (401, 403):
                 if is_retry:
                     raise AuthenticationError
-                else:
-                    self.access_token = self.account.get_fresh_access_token()
-                    return self.api_post(endpoint, is_retry=True, json=json)
-            elif ex.response.status_code in (408, 500):
+                self.access_token = self.account.get_fresh_access_token()
+                is_retry = True
+                continue
+
+            if status_code == 408:
                 raise VehicleAsleepError
-            else:
-                raise
 
-        return resp
+            is_retryable = method in IDEMPOTENT_METHODS or status_code in UNPROCESSED_STATUSES
+            if status_code in policy.retry_statuses and is_retryable and self._sleep_before_retry(
+                attempt, deadline, get_retry_after(resp)
+            ):
+                attempt += 1
+                continue
 
-    def api_delete(
-        self,
-        endpoint: str,
-    ) -> Response:
-        resp = requests.delete(
-            self.api_host + endpoint,
-            headers={
-                'Authorization': 'Bearer ' + self.access_token,
-                'Content-type': 'application/json',
-            },
-            verify=False,
-        )
-        try:
-            resp.raise_for_status()
-        except requests.HTTPError as ex:
-            if ex.response.status_code in (401, 403):
-                raise AuthenticationError
-            elif ex.response.status_code in (408, 500):
-                raise VehicleAsleepError
-            else:
-                raise
+            try:
+                resp.raise_for_status()
+            except requests.HTTPError as ex:
+                if status_code == 429:
+                    raise RateLimitedError(response=resp) from ex
+                elif status_code >= 500:
+                    if vin:
+                        self.circuit_breaker.record_failure(vin)
+                    raise ServerError(response=resp) from ex
+                else:
+                    raise
+
+            if vin:
+                self.circuit_breaker.record_success(vin)
+
+            return resp
+
+    def _sleep_before_retry(self, attempt: int, deadline: float, retry_after: float | None = None) -> bool:
+        """
+        Sleep before retry number attempt + 1, or return False if the policy allows no more retries.
+        """
+        if attempt + 1 >= self.retry_policy.max_attempts:
+            return False
+
+        delay = self.retry_policy.get_delay(attempt, retry_after)
+        if time.monotonic() + delay > deadline:
+            return False
 
-        return resp
+        time.sleep(delay)
+        return True
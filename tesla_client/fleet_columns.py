@@ -0,0 +1,231 @@
+import heapq
+import math
+import operator
+import threading
+from array import array
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Mapping
+from typing import TYPE_CHECKING
+
+from .vehicle import ChargeState
+from .vehicle import ClimateState
+from .vehicle import DriveState
+from .vehicle import VehicleState
+
+
+if TYPE_CHECKING:
+    from .vehicle import Vehicle
+
+
+STATE_CLASSES = {
+    'charge_state': ChargeState,
+    'climate_state': ClimateState,
+    'drive_state': DriveState,
+    'vehicle_state': VehicleState,
+}
+
+OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+Condition = tuple[str, str, Any]
+
+
+class Column:
+    """
+    Typed storage for one state field across all vehicles. Missing values are NaN for
+    floats and -1 for bools and strings; strings are stored as codes into categories.
+    """
+    name: str
+    section: str
+    kind: str
+    values: array
+    categories: list[str]
+    category_to_code: dict[str, int]
+
+    def __init__(self, name: str, section: str, annotation: str) -> None:
+        self.name = name
+        self.section = section
+        self.kind = annotation.split('|')[0].strip()
+        self.values = array({'float': 'd', 'bool': 'b', 'str': 'i'}[self.kind])
+        self.categories = []
+        self.category_to_code = {}
+
+    def encode(self, value: Any) -> float | int:
+        if self.kind == 'float':
+            return math.nan if value is None else float(value)
+        if value is None:
+            return -1
+        if self.kind == 'bool':
+            return int(bool(value))
+
+        code = self.category_to_code.get(value)
+        if code is None:
+            code = self.category_to_code[value] = len(self.categories)
+            self.categories.append(value)
+        return code
+
+    def decode(self, encoded: float | int) -> Any:
+        if self.kind == 'float':
+            return None if math.isnan(encoded) else encoded
+        if encoded == -1:
+            return None
+        if self.kind == 'bool':
+            return bool(encoded)
+        return self.categories[int(encoded)]
+
+    def encode_operand(self, value: Any) -> float | int | None:
+        """
+        Encode a query operand, or return None for a string that no vehicle has
+        """
+        if self.kind == 'str' and value is not None:
+            return self.category_to_code.get(value)
+        return self.encode(value)
+
+
+class FleetColumns:
+    """
+    Columnar view of ChargeState, ClimateState, DriveState and VehicleState fields for
+    many vehicles, one typed array per field, so fleet-wide queries scan arrays instead of
+    building per-vehicle objects.
+
+        columns.select(('battery_level', '<', 20), ('charging_state', '!=', 'Charging'))
+    """
+    vins: list[str]
+    vin_to_row: dict[str, int]
+    name_to_column: dict[str, Column]
+
+    def __init__(self, vehicles: Iterable['Vehicle'] = ()) -> None:
+        self.vins = []
+        self.vin_to_row = {}
+        self.name_to_column = {}
+        self._lock = threading.Lock()
+
+        for section, state_class in STATE_CLASSES.items():
+            for name, annotation in state_class.__annotations__.items():
+                self.name_to_column[name] = Column(name, section, annotation)
+
+        for vehicle in vehicles:
+            self.update(vehicle.vin, vehicle.get_cached_vehicle_data())
+
+    def __len__(self) -> int:
+        return len(self.vins)
+
+    def update(self, vin: str, vehicle_data: Mapping[str, Any]) -> None:
+        """
+        Write a vehicle's cached vehicle data into its row, adding the row if needed
+        """
+        with self._lock:
+            row = self.vin_to_row.get(vin)
+            if row is None:
+                row = self.vin_to_row[vin] = len(self.vins)
+                self.vins.append(vin)
+                for column in self.name_to_column.values():
+                    column.values.append(column.encode(None))
+
+            for column in self.name_to_column.values():
+                column.values[row] = column.encode(vehicle_data.get(column.section, {}).get(column.name))
+
+    def remove(self, vin: str) -> None:
+        with self._lock:
+            row = self.vin_to_row.pop(vin)
+            last_vin = self.vins.pop()
+            for column in self.name_to_column.values():
+                last_value = column.values.pop()
+                if last_vin != vin:
+                    column.values[row] = last_value
+            if last_vin != vin:
+                self.vins[row] = last_vin
+                self.vin_to_row[last_vin] = row
+
+    def get(self, vin: str, name: str) -> Any:
+        column = self.name_to_column[name]
+        return column.decode(column.values[self.vin_to_row[vin]])
+
+    def _select_rows(self, conditions: Iterable[Condition]) -> list[int]:
+        rows: Iterable[int] = range(len(self.vins))
+        for name, op, value in conditions:
+            column = self.name_to_column[name]
+            compare = OPERATORS[op]
+            operand = column.encode_operand(value)
+            values = column.values
+
+            if operand is None:
+                # a string no vehicle has: only != matches, and it matches everything
+                rows = rows if op == '!=' else []
+            elif column.kind == 'str' and op not in ('==', '!='):
+                raise ValueError(f'Cannot order strings in column {name}')
+            elif column.kind == 'bool' and op not in ('==', '!='):
+                rows = [row for row in rows if values[row] != -1 and compare(values[row], operand)]
+            else:
+                rows = [row for row in rows if compare(values[row], operand)]
+        return list(rows)
+
+    def select(self, *conditions: Condition) -> list[str]:
+        """
+        VINs of vehicles matching all (field, operator, value) conditions. Comparisons with
+        missing values are false, except for !=.
+        """
+        with self._lock:
+            return [self.vins[row] for row in self._select_rows(conditions)]
+
+    def aggregate(self, name: str, func: str = 'mean', where: Iterable[Condition] = ()) -> float | None:
+        """
+        func is one of count, sum, mean, min or max, computed over non-missing values
+        """
+        column = self.name_to_column[name]
+        with self._lock:
+            values = column.values
+            present = [
+                values[row] for row in self._select_rows(where)
+                if not (math.isnan(values[row]) if column.kind == 'float' else values[row] == -1)
+            ]
+
+        if func == 'count':
+            return len(present)
+        if column.kind == 'str':
+            raise ValueError(f'Cannot {func} strings in column {name}')
+        if not present:
+            return None
+        if func == 'sum':
+            return math.fsum(present)
+        if func == 'mean':
+            return math.fsum(present) / len(present)
+        if func == 'min':
+            return min(present)
+        if func == 'max':
+            return max(present)
+        raise ValueError(f'Unknown aggregate {func}')
+
+    def top_k(
+        self,
+        name: str,
+        k: int,
+        largest: bool = True,
+        where: Iterable[Condition] = (),
+    ) -> list[tuple[str, Any]]:
+        """
+        (vin, value) for the k vehicles with the largest (or smallest) non-missing values
+        """
+        column = self.name_to_column[name]
+        if column.kind == 'str':
+            raise ValueError(f'Cannot order strings in column {name}')
+
+        with self._lock:
+            values = column.values
+            rows = [
+                row for row in self._select_rows(where)
+                if not (math.isnan(values[row]) if column.kind == 'float' else values[row] == -1)
+            ]
+            select = heapq.nlargest if largest else heapq.nsmallest
+            return [
+                (self.vins[row], column.decode(values[row]))
+                for row in select(k, rows, key=values.__getitem__)
+            ]
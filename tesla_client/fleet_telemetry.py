@@ -1,8 +1,12 @@
-import copy
 import logging
 import time
 from typing import Any
+from typing import Mapping
 from kafka import KafkaConsumer  # type: ignore
+from tesla_client.fleet_columns import FleetColumns
+from tesla_client.geofence import GeofenceEngine
+from tesla_client.telemetry_log import TelemetryRecorder
+from tesla_client.telemetry_tuner import TelemetryTuner
 from tesla_client.vehicle import Vehicle
 from tesla_client.vehicle import VehicleDidNotWakeError
 from tesla_client.vehicle_data_pb2 import (  # type: ignore
@@ -15,44 +19,130 @@ from tesla_client.vehicle_data_pb2 import (  # type: ignore
 )
 
 
+# the cached vehicle data section each handled field is written to
+FIELD_TO_SECTION = {
+    Field.BatteryLevel: 'charge_state',
+    Field.EstBatteryRange: 'charge_state',
+    Field.ChargeLimitSoc: 'charge_state',
+    Field.DetailedChargeState: 'charge_state',
+    Field.FastChargerPresent: 'charge_state',
+    Field.TimeToFullCharge: 'charge_state',
+    Field.InsideTemp: 'climate_state',
+    Field.HvacPower: 'climate_state',
+    Field.OutsideTemp: 'climate_state',
+    Field.DestinationName: 'drive_state',
+    Field.DestinationLocation: 'drive_state',
+    Field.MinutesToArrival: 'drive_state',
+    Field.GpsHeading: 'drive_state',
+    Field.Location: 'drive_state',
+    Field.Gear: 'drive_state',
+    Field.VehicleSpeed: 'drive_state',
+    Field.Locked: 'vehicle_state',
+    Field.LocatedAtHome: 'location',
+}
+
+
 class FleetTelemetryListener:
+    """
+    - the Kafka consumer is created on the first listen(), unless one is passed in as
+      vehicle_consumer, so a listener built without bootstrap_server can still handle
+      messages, e.g. replayed from a TelemetryLogReader
+    - with load_vehicles=False, vehicles are used with whatever cached data they have
+      instead of being loaded from the API at startup
+    """
     vin_to_vehicle: dict[str, Vehicle]
-    vehicle_consumer: KafkaConsumer
+    vehicle_consumer: KafkaConsumer | None
+    bootstrap_server: str | None
+    kafka_group_id: str | None
+    kafka_topic: str
+    geofence_engine: GeofenceEngine | None = None
+    fleet_columns: FleetColumns | None = None
+    telemetry_tuner: TelemetryTuner | None = None
+    recorder: TelemetryRecorder | None = None
+    poll_timeout_ms: int = 1000
+    _vin_to_pending_position: dict[str, tuple[float, float]]
 
     def __init__(
         self,
         vehicles: list[Vehicle],
-        bootstrap_server: str,
-        kafka_group_id: str,
+        bootstrap_server: str | None = None,
+        kafka_group_id: str | None = None,
         kafka_topic: str = 'tesla_V',
+        geofence_engine: GeofenceEngine | None = None,
+        fleet_columns: FleetColumns | None = None,
+        telemetry_tuner: TelemetryTuner | None = None,
+        recorder: TelemetryRecorder | None = None,
+        vehicle_consumer: KafkaConsumer | None = None,
+        load_vehicles: bool = True,
     ) -> None:
         logging.info('Starting ' + self.__class__.__name__)
 
-        for vehicle in vehicles:
-            try:
-                vehicle.load_vehicle_data()
-            except VehicleDidNotWakeError:
-                logging.warning(f'At startup, failed to wake and load vehicle {vehicle.vin}')
+        if load_vehicles:
+            for vehicle in vehicles:
+                try:
+                    vehicle.load_vehicle_data()
+                except VehicleDidNotWakeError:
+                    logging.warning(f'At startup, failed to wake and load vehicle {vehicle.vin}')
 
         self.vin_to_vehicle = {vehicle.vin: vehicle for vehicle in vehicles}
-        self.vehicle_consumer = KafkaConsumer(
-            kafka_topic,
-            bootstrap_servers=[bootstrap_server],
-            group_id=kafka_group_id,
-        )
+
+        self.geofence_engine = geofence_engine
+        self._vin_to_pending_position = {}
+        if geofence_engine:
+            # establish initial geofence membership without notifying
+            geofence_engine.evaluate_vehicles(vehicles)
+
+        self.fleet_columns = fleet_columns
+        if fleet_columns is not None:
+            for vehicle in vehicles:
+                fleet_columns.update(vehicle.vin, vehicle.get_cached_vehicle_data())
+
+        self.telemetry_tuner = telemetry_tuner
+        self.recorder = recorder
+
+        self.bootstrap_server = bootstrap_server
+        self.kafka_group_id = kafka_group_id
+        self.kafka_topic = kafka_topic
+        self.vehicle_consumer = vehicle_consumer
 
     def listen(self) -> None:
+        if self.vehicle_consumer is None:
+            if not self.bootstrap_server:
+                raise ValueError('bootstrap_server is required to listen without a vehicle_consumer')
+            self.vehicle_consumer = KafkaConsumer(
+                self.kafka_topic,
+                bootstrap_servers=[self.bootstrap_server],
+                group_id=self.kafka_group_id,
+            )
+        consumer = self.vehicle_consumer
+
         logging.info('Listening for fleet telemetry messages')
 
         while True:
-            for message in self.vehicle_consumer:
-                payload = Payload.FromString(message.value)
-                try:
-                    self.handle_vehicle_message(payload)
-                except Exception:
-                    logging.exception(f'Error handling vehicle message for vehicle {payload.vin}')
+            # geofences are evaluated once per polled batch of messages rather than per message
+            for messages in consumer.poll(timeout_ms=self.poll_timeout_ms).values():
+                for message in messages:
+                    payload = Payload.FromString(message.value)
+                    if self.recorder:
+                        try:
+                            self.recorder.append(message.value, payload.vin)
+                        except Exception:
+                            logging.exception(f'Error recording vehicle message for vehicle {payload.vin}')
+                    try:
+                        self.handle_vehicle_message(payload, evaluate_geofences=False)
+                    except Exception:
+                        logging.exception(f'Error handling vehicle message for vehicle {payload.vin}')
 
-    def handle_vehicle_message(self, payload: Payload) -> None:
+            try:
+                self.evaluate_geofences()
+            except Exception:
+                logging.exception('Error evaluating geofences')
+
+    def handle_vehicle_message(self, payload: Payload, evaluate_geofences: bool = True) -> None:
+        """
+        - with evaluate_geofences=False, a new Location is only queued, for the next call to
+          evaluate_geofences()
+        """
         if payload.vin not in self.vin_to_vehicle:
             logging.warning(f'Ignoring vehicle message for unknown vehicle {payload.vin}')
             return
@@ -61,6 +151,9 @@ class FleetTelemetryListener:
 
         vehicle = self.vin_to_vehicle[payload.vin]
 
+        if self.telemetry_tuner:
+            self.telemetry_tuner.observe(payload)
+
         last_load_from_api = vehicle.get_last_load_from_api()
         if not last_load_from_api:
             vehicle.load_vehicle_data()
@@ -69,8 +162,68 @@ class FleetTelemetryListener:
 
         logging.info(f'data_dict: {data_dict}')
 
-        cvd = vehicle.get_cached_vehicle_data()
-        cvd_before = copy.deepcopy(cvd)
+        # retried on top of any concurrent write, e.g. a load_vehicle_data, instead of
+        # overwriting it
+        snapshot_before, snapshot = vehicle.update_cached_vehicle_data(
+            lambda cvd_before: self.apply_vehicle_message(cvd_before, data_dict)
+        )
+        cvd_before = snapshot_before.data
+        cvd = snapshot.data
+
+        if self.fleet_columns is not None:
+            self.fleet_columns.update(payload.vin, cvd)
+
+        for k1, v1 in cvd.items():
+            if isinstance(v1, Mapping) and v1 is not cvd_before.get(k1):
+                for k2, v2 in v1.items():
+                    try:
+                        assert cvd_before[k1][k2] == v2
+                    except KeyError:
+                        try:
+                            self.notify_vehicle_data_changed(payload.vin, k1, k2, None, v2)
+                        except Exception:
+                            logging.exception('Exception while notifying vehicle data change')
+                    except AssertionError:
+                        try:
+                            self.notify_vehicle_data_changed(payload.vin, k1, k2, cvd_before[k1][k2], v2)
+                        except Exception:
+                            logging.exception('Exception while notifying vehicle data change')
+
+        if self.geofence_engine and Field.Location in data_dict and data_dict[Field.Location]:
+            self._vin_to_pending_position[payload.vin] = (
+                cvd['drive_state']['latitude'],
+                cvd['drive_state']['longitude'],
+            )
+            if evaluate_geofences:
+                self.evaluate_geofences()
+
+    def evaluate_geofences(self) -> None:
+        """
+        Evaluate all queued Locations in one batch and notify of geofence enters and exits
+        """
+        if not self.geofence_engine or not self._vin_to_pending_position:
+            return
+
+        vin_to_position, self._vin_to_pending_position = self._vin_to_pending_position, {}
+        for event in self.geofence_engine.evaluate(
+            (vin, lat, lon) for vin, (lat, lon) in vin_to_position.items()
+        ):
+            try:
+                self.notify_vehicle_data_changed(
+                    event.vin, 'geofence', event.geofence_name, not event.entered, event.entered
+                )
+            except Exception:
+                logging.exception('Exception while notifying vehicle data change')
+
+    def apply_vehicle_message(self, cvd_before: Mapping[str, Any], data_dict: dict[int, Any]) -> dict[str, Any]:
+        """
+        New cached vehicle data from cvd_before with a message's fields applied
+        """
+        # copy-on-write: snapshots are read-only and shared with readers, so copy the sections
+        # this message can change; the others stay shared and are skipped when diffing
+        cvd = dict(cvd_before)
+        for k1 in {FIELD_TO_SECTION[key] for key in data_dict if key in FIELD_TO_SECTION}:
+            cvd[k1] = dict(cvd_before.get(k1, {}))
 
         # ChargeState
 
@@ -177,23 +330,7 @@ class FleetTelemetryListener:
 
         cvd['last_update'] = int(time.time())
 
-        vehicle.set_cached_vehicle_data(cvd)
-
-        for k1, v1 in cvd.items():
-            if isinstance(v1, dict):
-                for k2, v2 in v1.items():
-                    try:
-                        assert cvd_before[k1][k2] == v2
-                    except KeyError:
-                        try:
-                            self.notify_vehicle_data_changed(payload.vin, k1, k2, None, v2)
-                        except Exception:
-                            logging.exception('Exception while notifying vehicle data change')
-                    except AssertionError:
-                        try:
-                            self.notify_vehicle_data_changed(payload.vin, k1, k2, cvd_before[k1][k2], v2)
-                        except Exception:
-                            logging.exception('Exception while notifying vehicle data change')
+        return cvd
 
     def notify_vehicle_data_changed(self, vin: str, k1: str, k2: str, value_before: Any, value_after: Any) -> None:
         logging.info(f'Vehicle {vin} data changed: {k1}.{k2}: {value_before} → {value_after}')
@@ -0,0 +1,179 @@
+import math
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Iterable
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from .vehicle import Vehicle
+
+
+EARTH_RADIUS_METERS = 6371008.8
+
+Cell = tuple[int, int]
+
+
+@dataclass(frozen=True)
+class Geofence:
+    """
+    - a circle around (latitude, longitude) when radius_meters is set, otherwise a polygon
+      of (latitude, longitude) vertices
+    """
+    name: str
+    latitude: float | None = None
+    longitude: float | None = None
+    radius_meters: float | None = None
+    polygon: tuple[tuple[float, float], ...] = ()
+
+    def get_bounds(self) -> tuple[float, float, float, float]:
+        """
+        (min_latitude, min_longitude, max_latitude, max_longitude)
+        """
+        if self.radius_meters is not None:
+            assert self.latitude is not None and self.longitude is not None
+            dlat = math.degrees(self.radius_meters / EARTH_RADIUS_METERS)
+            dlon = dlat / max(math.cos(math.radians(self.latitude)), 1e-6)
+            return (self.latitude - dlat, self.longitude - dlon, self.latitude + dlat, self.longitude + dlon)
+
+        lats = [lat for lat, lon in self.polygon]
+        lons = [lon for lat, lon in self.polygon]
+        return (min(lats), min(lons), max(lats), max(lons))
+
+    def contains_points(self, points: list[tuple[float, float]]) -> list[bool]:
+        """
+        Batched point-in-region test over (latitude, longitude) points
+        """
+        if self.radius_meters is not None:
+            assert self.latitude is not None and self.longitude is not None
+            # equirectangular approximation, accurate to well under 1% at geofence scale
+            lat0 = math.radians(self.latitude)
+            lon0 = math.radians(self.longitude)
+            cos_lat0 = math.cos(lat0)
+            max_sq = (self.radius_meters / EARTH_RADIUS_METERS) ** 2
+            return [
+                ((math.radians(lon) - lon0) * cos_lat0) ** 2 + (math.radians(lat) - lat0) ** 2 <= max_sq
+                for lat, lon in points
+            ]
+
+        # ray casting, one pass over the polygon's edges for all points
+        inside = [False] * len(points)
+        vertices = self.polygon
+        for i in range(len(vertices)):
+            lat1, lon1 = vertices[i - 1]
+            lat2, lon2 = vertices[i]
+            if lat1 == lat2:
+                continue
+            slope = (lon2 - lon1) / (lat2 - lat1)
+            for j, (lat, lon) in enumerate(points):
+                if (lat1 > lat) != (lat2 > lat) and lon < lon1 + (lat - lat1) * slope:
+                    inside[j] = not inside[j]
+        return inside
+
+
+@dataclass
+class GeofenceEvent:
+    vin: str
+    geofence_name: str
+    entered: bool
+
+
+class GeofenceEngine:
+    """
+    Tracks which geofences each vehicle is in. Geofences are indexed in a grid of
+    cell_size_degrees cells, and positions are evaluated in batches: points are grouped by
+    cell, and each candidate geofence tests all of its cell's points at once.
+    """
+    cell_size_degrees: float
+
+    def __init__(self, geofences: Iterable[Geofence] = (), cell_size_degrees: float = 0.05) -> None:
+        self.cell_size_degrees = cell_size_degrees
+        self._lock = threading.Lock()
+        self._name_to_geofence: dict[str, Geofence] = {}
+        self._cell_to_geofences: defaultdict[Cell, list[Geofence]] = defaultdict(list)
+        self._vin_to_geofence_names: dict[str, frozenset[str]] = {}
+
+        for geofence in geofences:
+            self.add(geofence)
+
+    def _get_cell(self, latitude: float, longitude: float) -> Cell:
+        return (math.floor(latitude / self.cell_size_degrees), math.floor(longitude / self.cell_size_degrees))
+
+    def _get_cells(self, geofence: Geofence) -> list[Cell]:
+        min_lat, min_lon, max_lat, max_lon = geofence.get_bounds()
+        min_i, min_j = self._get_cell(min_lat, min_lon)
+        max_i, max_j = self._get_cell(max_lat, max_lon)
+        return [(i, j) for i in range(min_i, max_i + 1) for j in range(min_j, max_j + 1)]
+
+    def add(self, geofence: Geofence) -> None:
+        with self._lock:
+            if geofence.name in self._name_to_geofence:
+                self._remove(geofence.name)
+            self._name_to_geofence[geofence.name] = geofence
+            for cell in self._get_cells(geofence):
+                self._cell_to_geofences[cell].append(geofence)
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            self._remove(name)
+
+    def _remove(self, name: str) -> None:
+        geofence = self._name_to_geofence.pop(name)
+        for cell in self._get_cells(geofence):
+            self._cell_to_geofences[cell].remove(geofence)
+            if not self._cell_to_geofences[cell]:
+                del self._cell_to_geofences[cell]
+
+    def get_geofence_names(self, vin: str) -> frozenset[str]:
+        return self._vin_to_geofence_names.get(vin, frozenset())
+
+    def evaluate(self, positions: Iterable[tuple[str, float, float]]) -> list[GeofenceEvent]:
+        """
+        Update membership from (vin, latitude, longitude) positions and return the resulting
+        enter/exit events. If a vin appears more than once, its last position wins.
+        """
+        vin_to_position = {vin: (lat, lon) for vin, lat, lon in positions}
+
+        cell_to_vins: defaultdict[Cell, list[str]] = defaultdict(list)
+        for vin, (lat, lon) in vin_to_position.items():
+            cell_to_vins[self._get_cell(lat, lon)].append(vin)
+
+        events: list[GeofenceEvent] = []
+        with self._lock:
+            vin_to_names: dict[str, set[str]] = {vin: set() for vin in vin_to_position}
+            for cell, vins in cell_to_vins.items():
+                geofences = self._cell_to_geofences.get(cell)
+                if not geofences:
+                    continue
+                points = [vin_to_position[vin] for vin in vins]
+                for geofence in geofences:
+                    for vin, is_inside in zip(vins, geofence.contains_points(points)):
+                        if is_inside:
+                            vin_to_names[vin].add(geofence.name)
+
+            for vin, names in vin_to_names.items():
+                before = self._vin_to_geofence_names.get(vin, frozenset())
+                if names == before:
+                    continue
+                if names:
+                    self._vin_to_geofence_names[vin] = frozenset(names)
+                else:
+                    del self._vin_to_geofence_names[vin]
+                events.extend(GeofenceEvent(vin, name, False) for name in sorted(before - names))
+                events.extend(GeofenceEvent(vin, name, True) for name in sorted(names - before))
+
+        return events
+
+    def evaluate_vehicles(self, vehicles: Iterable['Vehicle']) -> list[GeofenceEvent]:
+        """
+        Batch-evaluate vehicles from their cached drive_state latitude/longitude
+        """
+        positions = []
+        for vehicle in vehicles:
+            drive_state = vehicle.get_cached_vehicle_data().get('drive_state', {})
+            lat = drive_state.get('latitude')
+            lon = drive_state.get('longitude')
+            if lat is not None and lon is not None:
+                positions.append((vehicle.vin, lat, lon))
+        return self.evaluate(positions)
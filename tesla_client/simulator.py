@@ -0,0 +1,459 @@
+"""
+Local Fleet API simulator for load testing Account, Vehicle and APIClient.
+
+    python -m tesla_client.simulator --vehicles 5000 --port 8000
+
+Models the endpoints this library calls (vehicles, vehicle_data, wake_up, command/*,
+fleet_status and fleet_telemetry_config) for thousands of virtual vehicles, with
+sleep/wake state, token expiry, rate limits, error injection and response latency.
+"""
+import argparse
+import json
+import math
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from dataclasses import field
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+from typing import Callable
+from urllib.parse import urlparse
+
+from .account import Account
+from .vehicle_data_pb2 import (  # type: ignore
+    Datum,
+    DetailedChargeStateValue,
+    Field,
+    HvacPowerState,
+    LocationValue,
+    Payload,
+    ShiftState,
+    Value,
+)
+
+
+LatencyDistribution = Callable[[random.Random], float]
+
+
+def constant_latency(seconds: float) -> LatencyDistribution:
+    return lambda rng: seconds
+
+
+def uniform_latency(low: float, high: float) -> LatencyDistribution:
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal_latency(median: float, sigma: float) -> LatencyDistribution:
+    """
+    Long-tailed latency, as seen when requests are relayed to vehicles over cellular
+    """
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+@dataclass
+class SimulatorConfig:
+    """
+    - wake_delay is the (min, max) seconds between the first wake_up and the vehicle coming online
+    - error_rates maps an HTTP status (401, 408, 429, 500, ...) to the probability that any
+      request is answered with it
+    - token_ttl is how many seconds an access token stays valid after it is first seen
+    - rate_limit is the number of requests allowed per token per rate_limit_window seconds
+    """
+    vehicle_count: int = 1000
+    asleep_probability: float = 0.5
+    wake_delay: tuple[float, float] = (2.0, 10.0)
+    latency: LatencyDistribution = constant_latency(0.0)
+    error_rates: dict[int, float] = field(default_factory=dict)
+    token_ttl: float = 8 * 60 * 60
+    rate_limit: int | None = None
+    rate_limit_window: float = 60.0
+    seed: int | None = None
+
+
+@dataclass
+class SimulatedVehicle:
+    vin: str
+    display_name: str
+    asleep: bool
+    vehicle_data: dict
+    wake_at: float | None = None
+    key_paired: bool = True
+    telemetry_config: dict | None = None
+
+    def update_wake_state(self, now: float) -> None:
+        if self.asleep and self.wake_at is not None and now >= self.wake_at:
+            self.asleep = False
+            self.wake_at = None
+
+    def get_state(self) -> str:
+        return 'asleep' if self.asleep else 'online'
+
+    def to_vehicle_json(self) -> dict:
+        return {
+            'vin': self.vin,
+            'display_name': self.display_name,
+            'state': self.get_state(),
+        }
+
+
+COMMAND_EFFECTS: dict[str, Callable[[dict, dict], None]] = {
+    'auto_conditioning_start': lambda vd, body: vd['climate_state'].update(is_climate_on=True),
+    'auto_conditioning_stop': lambda vd, body: vd['climate_state'].update(is_climate_on=False),
+    'charge_start': lambda vd, body: vd['charge_state'].update(charging_state='Charging'),
+    'charge_stop': lambda vd, body: vd['charge_state'].update(charging_state='Stopped'),
+    'door_lock': lambda vd, body: vd['vehicle_state'].update(locked=True),
+    'door_unlock': lambda vd, body: vd['vehicle_state'].update(locked=False),
+    'set_charge_limit': lambda vd, body: vd['charge_state'].update(charge_limit_soc=body.get('percent')),
+}
+
+
+class FleetAPISimulator:
+    config: SimulatorConfig
+    vin_to_vehicle: dict[str, SimulatedVehicle]
+    telemetry_queue: 'queue.Queue[bytes]'
+    server: ThreadingHTTPServer | None
+
+    def __init__(self, config: SimulatorConfig | None = None) -> None:
+        self.config = config or SimulatorConfig()
+        self.rng = random.Random(self.config.seed)
+        self.lock = threading.Lock()
+        self.token_to_expiry: dict[str, float] = {}
+        self.token_to_request_times: dict[str, list[float]] = {}
+        self.vin_to_vehicle = {}
+        self.telemetry_queue = queue.Queue()
+        self.server = None
+
+        for i in range(self.config.vehicle_count):
+            vehicle = self._make_vehicle(f'5YJ3E1EA7SIM{i:05d}', f'Sim Car {i}')
+            self.vin_to_vehicle[vehicle.vin] = vehicle
+
+    def __enter__(self) -> 'FleetAPISimulator':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> None:
+        class Handler(SimulatorRequestHandler):
+            simulator = self
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    @property
+    def url(self) -> str:
+        assert self.server is not None
+        host, port = self.server.socket.getsockname()[:2]
+        return f'http://{host}:{port}'
+
+    def issue_token(self) -> str:
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.token_to_expiry[token] = time.time() + self.config.token_ttl
+        return token
+
+    def expire_token(self, token: str) -> None:
+        with self.lock:
+            self.token_to_expiry[token] = 0.0
+
+    def _make_vehicle(self, vin: str, display_name: str) -> SimulatedVehicle:
+        rng = self.rng
+        return SimulatedVehicle(
+            vin=vin,
+            display_name=display_name,
+            asleep=rng.random() < self.config.asleep_probability,
+            vehicle_data={
+                'vin': vin,
+                'charge_state': {
+                    'battery_level': rng.randint(10, 100),
+                    'battery_range': rng.uniform(30.0, 300.0),
+                    'charge_limit_soc': 80,
+                    'charging_state': rng.choice(['Disconnected', 'Charging', 'Complete', 'Stopped']),
+                    'fast_charger_present': False,
+                    'time_to_full_charge': 0.0,
+                },
+                'climate_state': {
+                    'inside_temp': rng.uniform(50.0, 90.0),
+                    'is_climate_on': False,
+                    'outside_temp': rng.uniform(40.0, 90.0),
+                },
+                'drive_state': {
+                    'active_route_destination': None,
+                    'active_route_latitude': None,
+                    'active_route_longitude': None,
+                    'active_route_minutes_to_arrival': None,
+                    'heading': rng.uniform(0.0, 360.0),
+                    'latitude': rng.uniform(32.0, 42.0),
+                    'longitude': rng.uniform(-124.0, -114.0),
+                    'shift_state': 'P',
+                    'speed': None,
+                },
+                'vehicle_state': {
+                    'locked': True,
+                    'vehicle_name': display_name,
+                },
+            },
+        )
+
+    def handle(self, method: str, path: str, token: str | None, body: dict) -> tuple[int, dict]:
+        """
+        Route one request to its simulated endpoint. Returns (status, json body).
+        """
+        time.sleep(max(self.config.latency(self.rng), 0.0))
+
+        with self.lock:
+            now = time.time()
+
+            if token and token not in self.token_to_expiry:
+                self.token_to_expiry[token] = now + self.config.token_ttl
+
+            if not token or self.token_to_expiry[token] < now:
+                return 401, {'error': 'invalid bearer token'}
+
+            if self.config.rate_limit is not None:
+                window_start = now - self.config.rate_limit_window
+                request_times = [t for t in self.token_to_request_times.get(token, []) if t > window_start]
+                if len(request_times) >= self.config.rate_limit:
+                    self.token_to_request_times[token] = request_times
+                    return 429, {'error': 'rate limited'}
+                request_times.append(now)
+                self.token_to_request_times[token] = request_times
+
+            for status, rate in self.config.error_rates.items():
+                if self.rng.random() < rate:
+                    return status, {'error': f'injected {status}'}
+
+            return self._route(method, path, body, now)
+
+    def _route(self, method: str, path: str, body: dict, now: float) -> tuple[int, dict]:
+        if method == 'GET' and path == '/api/1/vehicles':
+            return 200, {
+                'response': [v.to_vehicle_json() for v in self.vin_to_vehicle.values()],
+                'count': len(self.vin_to_vehicle),
+            }
+
+        if method == 'POST' and path == '/api/1/vehicles/fleet_status':
+            vins = [vin for vin in body.get('vins', []) if vin in self.vin_to_vehicle]
+            return 200, {'response': {
+                'key_paired_vins': [vin for vin in vins if self.vin_to_vehicle[vin].key_paired],
+                'unpaired_vins': [vin for vin in vins if not self.vin_to_vehicle[vin].key_paired],
+                'vehicle_info': {
+                    vin: {'vehicle_command_protocol_required': True} for vin in vins
+                },
+            }}
+
+        if method == 'POST' and path == '/api/1/vehicles/fleet_telemetry_config':
+            vehicles = [self.vin_to_vehicle[vin] for vin in body.get('vins', []) if vin in self.vin_to_vehicle]
+            missing_key = [v.vin for v in vehicles if not v.key_paired]
+            for vehicle in vehicles:
+                if vehicle.key_paired:
+                    vehicle.telemetry_config = body.get('config')
+            return 200, {'response': {
+                'updated_vehicles': len(vehicles) - len(missing_key),
+                'skipped_vehicles': {'missing_key': missing_key},
+            }}
+
+        match = re.fullmatch(r'/api/1/vehicles/([^/]+)/(.+)', path)
+        if not match or match.group(1) not in self.vin_to_vehicle:
+            return 404, {'error': 'not found'}
+
+        vehicle = self.vin_to_vehicle[match.group(1)]
+        action = match.group(2)
+        vehicle.update_wake_state(now)
+
+        if action == 'fleet_telemetry_config':
+            if method == 'GET':
+                return 200, {'response': {'synced': True, 'config': vehicle.telemetry_config}}
+            if method == 'DELETE':
+                vehicle.telemetry_config = None
+                return 200, {'response': {'updated_vehicles': 1}}
+
+        if method == 'POST' and action == 'wake_up':
+            if vehicle.asleep and vehicle.wake_at is None:
+                vehicle.wake_at = now + self.rng.uniform(*self.config.wake_delay)
+                vehicle.update_wake_state(now)
+            return 200, {'response': vehicle.to_vehicle_json()}
+
+        if method == 'GET' and action == 'vehicle_data':
+            if vehicle.asleep:
+                return 408, {'error': 'vehicle unavailable: vehicle is offline or asleep'}
+            return 200, {'response': json.loads(json.dumps(vehicle.vehicle_data))}
+
+        if method == 'POST' and action.startswith('command/'):
+            if vehicle.asleep:
+                return 408, {'error': 'vehicle unavailable: vehicle is offline or asleep'}
+            effect = COMMAND_EFFECTS.get(action[len('command/'):])
+            if effect:
+                effect(vehicle.vehicle_data, body)
+            return 200, {'response': {'result': True, 'reason': ''}}
+
+        return 404, {'error': 'not found'}
+
+    def put_to_sleep(self, vin: str) -> None:
+        with self.lock:
+            vehicle = self.vin_to_vehicle[vin]
+            vehicle.asleep = True
+            vehicle.wake_at = None
+
+    def emit_telemetry(self, vins: list[str] | None = None) -> int:
+        """
+        Put a serialized Payload on telemetry_queue for every online vehicle with a
+        fleet_telemetry_config, carrying the configured fields that the simulator models.
+        Returns the number of payloads emitted.
+        """
+        emitted = 0
+        with self.lock:
+            now = time.time()
+            for vin in vins if vins is not None else list(self.vin_to_vehicle):
+                vehicle = self.vin_to_vehicle[vin]
+                vehicle.update_wake_state(now)
+                if vehicle.asleep or not vehicle.telemetry_config:
+                    continue
+
+                payload = make_telemetry_payload(vehicle, vehicle.telemetry_config.get('fields', {}))
+                self.telemetry_queue.put(payload.SerializeToString())
+                emitted += 1
+
+        return emitted
+
+
+def make_telemetry_payload(vehicle: SimulatedVehicle, fields: dict[str, Any]) -> Payload:
+    charge_state = vehicle.vehicle_data['charge_state']
+    climate_state = vehicle.vehicle_data['climate_state']
+    drive_state = vehicle.vehicle_data['drive_state']
+    vehicle_state = vehicle.vehicle_data['vehicle_state']
+
+    field_to_value = {
+        'BatteryLevel': lambda: Value(double_value=charge_state['battery_level']),
+        'EstBatteryRange': lambda: Value(double_value=charge_state['battery_range']),
+        'ChargeLimitSoc': lambda: Value(int_value=charge_state['charge_limit_soc']),
+        'DetailedChargeState': lambda: Value(detailed_charge_state_value=DetailedChargeStateValue.Value(
+            'DetailedChargeState' + charge_state['charging_state']
+        )),
+        'FastChargerPresent': lambda: Value(boolean_value=charge_state['fast_charger_present']),
+        'TimeToFullCharge': lambda: Value(double_value=charge_state['time_to_full_charge']),
+        'InsideTemp': lambda: Value(double_value=climate_state['inside_temp']),
+        'OutsideTemp': lambda: Value(double_value=climate_state['outside_temp']),
+        'HvacPower': lambda: Value(hvac_power_value=(
+            HvacPowerState.HvacPowerStateOn if climate_state['is_climate_on'] else HvacPowerState.HvacPowerStateOff
+        )),
+        'GpsHeading': lambda: Value(double_value=drive_state['heading']),
+        'Location': lambda: Value(location_value=LocationValue(
+            latitude=drive_state['latitude'],
+            longitude=drive_state['longitude'],
+        )),
+        'Gear': lambda: Value(shift_state_value=ShiftState.Value('ShiftState' + drive_state['shift_state'])),
+        'VehicleSpeed': lambda: Value(double_value=drive_state['speed'] or 0.0),
+        'Locked': lambda: Value(boolean_value=vehicle_state['locked']),
+    }
+
+    payload = Payload(
+        vin=vehicle.vin,
+        data=[
+            Datum(key=Field.Value(name), value=field_to_value[name]())
+            for name in fields
+            if name in field_to_value
+        ],
+    )
+    payload.created_at.GetCurrentTime()
+    return payload
+
+
+class SimulatorRequestHandler(BaseHTTPRequestHandler):
+    simulator: FleetAPISimulator
+    protocol_version = 'HTTP/1.1'
+    # avoid Nagle + delayed ACK stalls between the header and body writes on keep-alive
+    disable_nagle_algorithm = True
+
+    def _handle(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        raw_body = self.rfile.read(length) if length else b''
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            body = {}
+
+        authorization = self.headers.get('Authorization', '')
+        token = authorization[len('Bearer '):] if authorization.startswith('Bearer ') else None
+
+        status, response = self.simulator.handle(
+            self.command,
+            urlparse(self.path).path,
+            token,
+            body if isinstance(body, dict) else {},
+        )
+
+        response_body = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response_body)))
+        if status == 429:
+            self.send_header('Retry-After', str(int(self.simulator.config.rate_limit_window)))
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    do_GET = _handle
+    do_POST = _handle
+    do_DELETE = _handle
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class SimulatedAccount(Account):
+    """
+    Account whose access tokens are issued by a FleetAPISimulator
+    """
+    simulator: FleetAPISimulator
+
+    def __init__(self, simulator: FleetAPISimulator) -> None:
+        self.simulator = simulator
+        super().__init__(api_host=simulator.url)
+
+    def get_fresh_access_token(self) -> str:
+        return self.simulator.issue_token()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Run a local Fleet API simulator')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--vehicles', type=int, default=1000)
+    parser.add_argument('--asleep-probability', type=float, default=0.5)
+    parser.add_argument('--latency-median', type=float, default=0.0, help='seconds; lognormal when > 0')
+    parser.add_argument('--error-rate', action='append', default=[], metavar='STATUS=RATE')
+    parser.add_argument('--rate-limit', type=int, default=None, help='requests per token per minute')
+    args = parser.parse_args(argv)
+
+    simulator = FleetAPISimulator(SimulatorConfig(
+        vehicle_count=args.vehicles,
+        asleep_probability=args.asleep_probability,
+        latency=lognormal_latency(args.latency_median, 0.5) if args.latency_median > 0 else constant_latency(0.0),
+        error_rates={int(s): float(r) for s, r in (e.split('=') for e in args.error_rate)},
+        rate_limit=args.rate_limit,
+    ))
+    simulator.start(args.host, args.port)
+    print(f'Simulating {args.vehicles} vehicles at {simulator.url}')
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""
+Append-only log of raw telemetry Payloads, for replaying production traffic offline.
+
+A log is a directory of segments. Each segment is a pair of files:
+- NNNNNNNN.seg: records of a RECORD_HEADER (payload length, timestamp in ns) and the raw
+  serialized Payload
+- NNNNNNNN.idx: one fixed-size INDEX_ENTRY (timestamp in ns, record offset, VIN) per
+  record, so readers can binary search by time and filter by VIN without reading payloads
+- NNNNNNNN.vins: the VINs in the segment, one per line, written when the segment is closed,
+  so readers filtering by VIN can skip whole segments. A segment without one, e.g. because
+  the recorder did not close cleanly, has its VINs read from its index instead.
+"""
+import bisect
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterator
+from typing import Protocol
+
+from .vehicle_data_pb2 import Payload  # type: ignore
+
+
+RECORD_HEADER = struct.Struct('<IQ')
+INDEX_ENTRY = struct.Struct('<QQ17s')
+
+
+class TelemetryMessageHandler(Protocol):
+    def handle_vehicle_message(self, payload: Payload) -> None:
+        ...
+
+
+class TelemetryRecorder:
+    directory: str
+    max_segment_bytes: int
+
+    def __init__(self, directory: str, max_segment_bytes: int = 64 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self._lock = threading.Lock()
+        self._last_timestamp_ns = 0
+
+        os.makedirs(directory, exist_ok=True)
+        existing = sorted(name for name in os.listdir(directory) if name.endswith('.seg'))
+        self._segment_number = int(existing[-1][:-len('.seg')]) + 1 if existing else 0
+        self._open_segment()
+
+    def __enter__(self) -> 'TelemetryRecorder':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _open_segment(self) -> None:
+        self._segment_base = os.path.join(self.directory, f'{self._segment_number:08d}')
+        self._segment_file = open(self._segment_base + '.seg', 'ab')
+        self._index_file = open(self._segment_base + '.idx', 'ab')
+        self._segment_bytes = 0
+        self._segment_vins: set[str] = set()
+
+    def append(self, raw: bytes, vin: str, timestamp_ns: int | None = None) -> None:
+        with self._lock:
+            # keep timestamps non-decreasing so readers can binary search them
+            timestamp_ns = max(timestamp_ns or time.time_ns(), self._last_timestamp_ns)
+            self._last_timestamp_ns = timestamp_ns
+
+            if self._segment_bytes >= self.max_segment_bytes:
+                self._close_segment()
+                self._segment_number += 1
+                self._open_segment()
+
+            offset = self._segment_bytes
+            self._segment_file.write(RECORD_HEADER.pack(len(raw), timestamp_ns))
+            self._segment_file.write(raw)
+            self._index_file.write(INDEX_ENTRY.pack(timestamp_ns, offset, vin.encode()))
+            self._segment_bytes += RECORD_HEADER.size + len(raw)
+            self._segment_vins.add(vin)
+
+    def flush(self) -> None:
+        with self._lock:
+            # data before index, so index entries never point past the end of the data
+            self._segment_file.flush()
+            self._index_file.flush()
+
+    def _close_segment(self) -> None:
+        self._segment_file.close()
+        self._index_file.close()
+
+        # written last and renamed into place, so a .vins file always covers its whole segment
+        with open(self._segment_base + '.vins.tmp', 'w') as f:
+            f.write(''.join(vin + '\n' for vin in sorted(self._segment_vins)))
+        os.replace(self._segment_base + '.vins.tmp', self._segment_base + '.vins')
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_segment()
+
+
+@dataclass
+class Segment:
+    data: mmap.mmap
+    index: mmap.mmap
+    entry_count: int
+    vins: frozenset[str] = frozenset()
+
+    def get_entry(self, i: int) -> tuple[int, int, str]:
+        timestamp_ns, offset, vin = INDEX_ENTRY.unpack_from(self.index, i * INDEX_ENTRY.size)
+        return timestamp_ns, offset, vin.rstrip(b'\0').decode()
+
+    def get_timestamp_ns(self, i: int) -> int:
+        return INDEX_ENTRY.unpack_from(self.index, i * INDEX_ENTRY.size)[0]
+
+
+class TelemetryLogReader:
+    """
+    Memory-maps a log's segments for filtered reads and replays
+    """
+    directory: str
+    segments: list[Segment]
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.segments = []
+
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.seg'):
+                continue
+            base = os.path.join(directory, name[:-len('.seg')])
+            data_size = os.path.getsize(base + '.seg')
+            index_size = os.path.getsize(base + '.idx')
+            if not data_size or not index_size:
+                continue
+
+            with open(base + '.seg', 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            with open(base + '.idx', 'rb') as f:
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            segment = Segment(data, index, index_size // INDEX_ENTRY.size)
+            # drop index entries whose record was not fully written
+            while segment.entry_count:
+                _, offset, _ = segment.get_entry(segment.entry_count - 1)
+                if offset + RECORD_HEADER.size <= data_size:
+                    length, _ = RECORD_HEADER.unpack_from(data, offset)
+                    if offset + RECORD_HEADER.size + length <= data_size:
+                        break
+                segment.entry_count -= 1
+
+            if os.path.exists(base + '.vins'):
+                with open(base + '.vins') as f:
+                    segment.vins = frozenset(f.read().split())
+            else:
+                segment.vins = frozenset(segment.get_entry(i)[2] for i in range(segment.entry_count))
+            self.segments.append(segment)
+
+    def __enter__(self) -> 'TelemetryLogReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for segment in self.segments:
+            segment.data.close()
+            segment.index.close()
+        self.segments = []
+
+    def read(
+        self,
+        vins: set[str] | None = None,
+        start: float | None = None,
+        end: float | None = None,
+    ) -> Iterator[tuple[int, bytes]]:
+        """
+        Yield (timestamp_ns, raw Payload) in recorded order, for records of the given VINs
+        with start <= time < end (seconds since the epoch)
+        """
+        start_ns = int(start * 1e9) if start is not None else None
+        end_ns = int(end * 1e9) if end is not None else None
+
+        for segment in self.segments:
+            if not segment.entry_count:
+                continue
+            if vins is not None and segment.vins.isdisjoint(vins):
+                continue
+            if end_ns is not None and segment.get_timestamp_ns(0) >= end_ns:
+                continue
+            if start_ns is not None and segment.get_timestamp_ns(segment.entry_count - 1) < start_ns:
+                continue
+
+            first = 0
+            if start_ns is not None:
+                first = bisect.bisect_left(range(segment.entry_count), start_ns, key=segment.get_timestamp_ns)
+
+            for i in range(first, segment.entry_count):
+                timestamp_ns, offset, vin = segment.get_entry(i)
+                if end_ns is not None and timestamp_ns >= end_ns:
+                    break
+                if vins is not None and vin not in vins:
+                    continue
+
+                length, _ = RECORD_HEADER.unpack_from(segment.data, offset)
+                start_offset = offset + RECORD_HEADER.size
+                yield timestamp_ns, segment.data[start_offset:start_offset + length]
+
+    def replay(
+        self,
+        handler: TelemetryMessageHandler,
+        vins: set[str] | None = None,
+        start: float | None = None,
+        end: float | None = None,
+        speed: float | None = None,
+    ) -> int:
+        """
+        Feed records to handler.handle_vehicle_message, as fast as possible when speed is
+        None, or paced at speed times real time. Returns the number of records replayed.
+        """
+        count = 0
+        first_timestamp_ns = None
+        replay_started = time.monotonic()
+
+        for timestamp_ns, raw in self.read(vins, start, end):
+            if speed:
+                if first_timestamp_ns is None:
+                    first_timestamp_ns = timestamp_ns
+                delay = (timestamp_ns - first_timestamp_ns) / 1e9 / speed - (time.monotonic() - replay_started)
+                if delay > 0:
+                    time.sleep(delay)
+
+            payload = Payload.FromString(raw)
+            try:
+                handler.handle_vehicle_message(payload)
+            except Exception:
+                logging.exception(f'Error replaying vehicle message for vehicle {payload.vin}')
+            count += 1
+
+        return count
@@ -0,0 +1,169 @@
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any
+from typing import Iterable
+
+from .vehicle import DEFAULT_FLEET_TELEMETRY_FIELDS
+from .vehicle import Vehicle
+from .vehicle import make_fleet_telemetry_config
+from .vehicle_data_pb2 import Field  # type: ignore
+from .vehicle_data_pb2 import Payload  # type: ignore
+
+
+DRIVING_SHIFT_STATES = ('D', 'R', 'N')
+
+# fields whose value changes continuously while a vehicle is moving
+DRIVING_FIELDS = ('GpsHeading', 'Location', 'MinutesToArrival', 'VehicleSpeed')
+
+
+@dataclass
+class FieldStats:
+    messages: int = 0
+    changes: int = 0
+    last_value: Any = None
+
+
+class TelemetryTuner:
+    """
+    Adapts fleet telemetry field intervals per vehicle from observed traffic.
+
+    Feed it every Payload via observe() (FleetTelemetryListener does this when given a
+    telemetry_tuner), then call tune() periodically. Per vehicle and field, since the
+    previous tune():
+    - while driving, DRIVING_FIELDS are requested every driving_interval_seconds
+    - otherwise, a field sent at least min_messages times whose value changed in at most
+      redundant_change_ratio of its messages is slowed down by slowdown_factor, up to
+      max_interval_seconds, and stays slowed until its value changes
+    - fields the vehicle sends that are unknown to this Field enum are ignored
+    Only VINs whose field config changed are re-paired, through
+    Account.reconcile_fleet_telemetry.
+    """
+    hostname: str
+    port: int
+    certificate: str
+    fields: dict[str, Any]
+    driving_interval_seconds: int
+    min_messages: int
+    redundant_change_ratio: float
+    slowdown_factor: int
+    max_interval_seconds: int
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        certificate: str,
+        fields: dict[str, Any] = DEFAULT_FLEET_TELEMETRY_FIELDS,
+        driving_interval_seconds: int = 10,
+        min_messages: int = 10,
+        redundant_change_ratio: float = 0.2,
+        slowdown_factor: int = 10,
+        max_interval_seconds: int = 600,
+    ) -> None:
+        self.hostname = hostname
+        self.port = port
+        self.certificate = certificate
+        self.fields = fields
+        self.driving_interval_seconds = driving_interval_seconds
+        self.min_messages = min_messages
+        self.redundant_change_ratio = redundant_change_ratio
+        self.slowdown_factor = slowdown_factor
+        self.max_interval_seconds = max_interval_seconds
+
+        self._lock = threading.Lock()
+        self._vin_to_field_stats: defaultdict[str, defaultdict[str, FieldStats]] = defaultdict(
+            lambda: defaultdict(FieldStats)
+        )
+        self._vin_to_applied_fields: dict[str, dict[str, Any]] = {}
+
+    def observe(self, payload: Payload) -> None:
+        with self._lock:
+            name_to_stats = self._vin_to_field_stats[payload.vin]
+            for datum in payload.data:
+                try:
+                    name = Field.Name(datum.key)
+                except ValueError:
+                    # a field added to the protocol after vehicle_data_pb2 was generated
+                    continue
+                stats = name_to_stats[name]
+                stats.messages += 1
+                if datum.value != stats.last_value:
+                    stats.changes += 1
+                    stats.last_value = datum.value
+
+    def get_applied_fields(self, vin: str) -> dict[str, Any]:
+        return self._vin_to_applied_fields.get(vin, self.fields)
+
+    def compute_fields(self, vehicle: Vehicle) -> dict[str, Any]:
+        shift_state = vehicle.get_cached_vehicle_data().get('drive_state', {}).get('shift_state')
+        is_driving = shift_state in DRIVING_SHIFT_STATES
+
+        applied_fields = self.get_applied_fields(vehicle.vin)
+
+        with self._lock:
+            name_to_stats: dict[str, FieldStats] = self._vin_to_field_stats.get(vehicle.vin, {})
+            tuned_fields = {}
+            for name, base in self.fields.items():
+                interval = base['interval_seconds']
+                applied_interval = applied_fields.get(name, base)['interval_seconds']
+                stats = name_to_stats.get(name)
+                is_redundant = stats is not None and stats.messages >= self.min_messages and (
+                    stats.changes <= stats.messages * self.redundant_change_ratio
+                )
+                # a slowed field sends too few messages per window to be judged redundant
+                # again, so keep it slowed until its value changes instead
+                is_slowed = applied_interval > interval and not (stats and stats.changes)
+
+                if is_driving and name in DRIVING_FIELDS:
+                    interval = min(interval, self.driving_interval_seconds)
+                elif is_slowed:
+                    interval = applied_interval
+                elif is_redundant:
+                    interval = min(interval * self.slowdown_factor, self.max_interval_seconds)
+
+                tuned_fields[name] = {**base, 'interval_seconds': interval}
+
+        return tuned_fields
+
+    def tune(self, vehicles: Iterable[Vehicle]) -> list[str]:
+        """
+        Re-pair vehicles whose tuned field config differs from the one last applied, and
+        start a new observation window. Returns the re-paired VINs.
+        """
+        account_id_to_vehicles: defaultdict[int, list[Vehicle]] = defaultdict(list)
+        vin_to_fields = {}
+        for vehicle in vehicles:
+            fields = self.compute_fields(vehicle)
+            if fields != self.get_applied_fields(vehicle.vin):
+                vin_to_fields[vehicle.vin] = fields
+                account_id_to_vehicles[id(vehicle.account)].append(vehicle)
+
+        repaired_vins = []
+        for account_vehicles in account_id_to_vehicles.values():
+            try:
+                result = account_vehicles[0].account.reconcile_fleet_telemetry(
+                    account_vehicles,
+                    {v.vin: self._make_config(vin_to_fields[v.vin]) for v in account_vehicles},
+                    {v.vin: self._make_config(self.get_applied_fields(v.vin)) for v in account_vehicles},
+                    refresh_statuses=False,
+                )
+            except Exception:
+                logging.exception(f'Failed to apply tuned fleet telemetry configs to {len(account_vehicles)} vehicles')
+                continue
+
+            for vin in result.updated_vins:
+                self._vin_to_applied_fields[vin] = vin_to_fields[vin]
+            repaired_vins.extend(result.updated_vins)
+
+        with self._lock:
+            for name_to_stats in self._vin_to_field_stats.values():
+                for stats in name_to_stats.values():
+                    stats.messages = 0
+                    stats.changes = 0
+
+        return repaired_vins
+
+    def _make_config(self, fields: dict[str, Any]) -> dict[str, Any]:
+        return make_fleet_telemetry_config(self.hostname, self.port, self.certificate, fields)
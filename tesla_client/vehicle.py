@@ -1,8 +1,12 @@
 from __future__ import annotations
+from types import MappingProxyType
 from typing import Any
+from typing import Callable
+from typing import Mapping
 from typing import TYPE_CHECKING
 
 import random
+import threading
 import time
 from dataclasses import dataclass
 
@@ -40,6 +44,22 @@ DEFAULT_FLEET_TELEMETRY_FIELDS = {
 }
 
 
+def make_fleet_telemetry_config(
+    hostname: str,
+    port: int,
+    certificate: str,
+    fields: dict[str, Any] = DEFAULT_FLEET_TELEMETRY_FIELDS,
+) -> dict[str, Any]:
+    return {
+        'prefer_typed': True,
+        'hostname': hostname,
+        'port': port,
+        'ca': certificate,
+        'fields': fields,
+        'alert_types': ['service'],
+    }
+
+
 class VehicleNotFoundError(Exception):
     pass
 
@@ -59,6 +79,44 @@ class FleetTelemetryStatus:
     fleet_telemetry_paired: bool
 
 
+def freeze_vehicle_data(value: Any) -> Any:
+    """
+    Read-only view of value: dicts at any depth become MappingProxyTypes and lists become
+    tuples, and values that are already frozen are shared instead of copied
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze_vehicle_data(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze_vehicle_data(v) for v in value)
+    return value
+
+
+def thaw_vehicle_data(value: Any) -> Any:
+    """
+    Deep mutable copy of frozen vehicle data, as plain dicts and lists
+    """
+    if isinstance(value, Mapping):
+        return {k: thaw_vehicle_data(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw_vehicle_data(v) for v in value]
+    return value
+
+
+@dataclass(frozen=True)
+class VehicleDataSnapshot:
+    """
+    - data is read-only; to update, build a new dict and pass it to
+      Vehicle.set_cached_vehicle_data or Vehicle.update_cached_vehicle_data, copying only
+      the sections that change
+    - data cannot be passed to json.dumps, copy.deepcopy or pickle; use to_dict() for that
+    """
+    version: int
+    data: Mapping[str, Any]
+
+    def to_dict(self) -> dict[str, Any]:
+        return thaw_vehicle_data(self.data)
+
+
 @dataclass
 class ChargeState:
     """
@@ -112,7 +170,8 @@ class Vehicle:
     display_name: str
     online_as_of: int | None
     _fleet_telemetry_status: FleetTelemetryStatus | None = None
-    _cached_vehicle_data: dict
+    _snapshot: VehicleDataSnapshot
+    _snapshot_changed: threading.Condition
 
     def __init__(
         self,
@@ -124,15 +183,19 @@ class Vehicle:
         self.display_name = vehicle_json['display_name']
         self.online_as_of = int(time.time()) if vehicle_json['state'] == 'online' else None
         self._fleet_telemetry_status = None
-        self._cached_vehicle_data: dict = {}
+        self._snapshot = VehicleDataSnapshot(version=0, data=MappingProxyType({}))
+        self._snapshot_changed = threading.Condition()
 
     def wake_up(self) -> None:
-        for attempt in range(3):
+        client = self.account.client
+        policy = client.retry_policy
+
+        for attempt in range(policy.wake_attempts):
             # jitter to prevent burst of wakeup requests
-            time.sleep(random.uniform(2, 10))
+            time.sleep(random.uniform(*policy.wake_delay))
 
             try:
-                status = self.account.client.api_post(
+                status = client.api_post(
                     '/api/1/vehicles/{}/wake_up'.format(self.vin)
                 ).json()['response']
             except requests.HTTPError:
@@ -140,6 +203,7 @@ class Vehicle:
             if status and status['state'] == 'online':
                 return
 
+        client.circuit_breaker.record_failure(self.vin)
         raise VehicleDidNotWakeError
 
     def is_using_fleet_telemetry(self) -> bool:
@@ -195,14 +259,7 @@ class Vehicle:
         self.account.client.api_post(
             '/api/1/vehicles/fleet_telemetry_config',
             json={
-                'config': {
-                    'prefer_typed': True,
-                    'hostname': hostname,
-                    'port': port,
-                    'ca': certificate,
-                    'fields': fields,
-                    'alert_types': ['service'],
-                },
+                'config': make_fleet_telemetry_config(hostname, port, certificate, fields),
                 'vins': [self.vin],
             }
         )
@@ -212,11 +269,53 @@ class Vehicle:
         self.account.client.api_delete(f'/api/1/vehicles/{self.vin}/fleet_telemetry_config')
         self.refresh_fleet_telemetry_status()
 
-    def get_cached_vehicle_data(self) -> dict:
-        return self._cached_vehicle_data
+    def get_snapshot(self) -> VehicleDataSnapshot:
+        # snapshots are never mutated, so readers need no lock
+        return self._snapshot
 
-    def set_cached_vehicle_data(self, vehicle_data: dict) -> None:
-        self._cached_vehicle_data = vehicle_data
+    def get_cached_vehicle_data(self) -> Mapping[str, Any]:
+        return self._snapshot.data
+
+    def set_cached_vehicle_data(self, vehicle_data: Mapping[str, Any], expected_version: int | None = None) -> bool:
+        """
+        Replace the cached vehicle data. With expected_version, only if the snapshot is still
+        at that version; returns whether the data was replaced.
+        """
+        return self._swap_snapshot(vehicle_data, expected_version) is not None
+
+    def update_cached_vehicle_data(
+        self,
+        update: Callable[[Mapping[str, Any]], Mapping[str, Any]],
+    ) -> tuple[VehicleDataSnapshot, VehicleDataSnapshot]:
+        """
+        Replace the cached vehicle data with update(current data), calling update again on
+        the newer data if another write got in first, so no concurrent write is lost.
+        Returns the snapshots before and after.
+        """
+        while True:
+            before = self._snapshot
+            after = self._swap_snapshot(update(before.data), before.version)
+            if after:
+                return before, after
+
+    def _swap_snapshot(self, vehicle_data: Mapping[str, Any], expected_version: int | None) -> VehicleDataSnapshot | None:
+        data = freeze_vehicle_data(dict(vehicle_data))
+        with self._snapshot_changed:
+            if expected_version is not None and self._snapshot.version != expected_version:
+                return None
+            self._snapshot = VehicleDataSnapshot(version=self._snapshot.version + 1, data=data)
+            self._snapshot_changed.notify_all()
+            return self._snapshot
+
+    def wait_for_version(self, version: int, timeout: float | None = None) -> VehicleDataSnapshot | None:
+        """
+        Block until the snapshot version is greater than version. Returns the snapshot, or
+        None on timeout.
+        """
+        with self._snapshot_changed:
+            if self._snapshot_changed.wait_for(lambda: self._snapshot.version > version, timeout):
+                return self._snapshot
+        return None
 
     def load_vehicle_data(self, should_wake: bool = True) -> None:
         VEHICLE_DATA_ENDPOINTS_QS = '%3B'.join([
@@ -258,21 +357,18 @@ class Vehicle:
         return self.get_cached_vehicle_data().get('last_load_from_api', None)
 
     def _get_data_for_state(self, state_key: str, state_class: type) -> type:
-        cvd = self.get_cached_vehicle_data()
-
         for attempt in range(3):
+            cvd = self.get_cached_vehicle_data()
             try:
-                data = state_class(**{  # type: ignore
+                return state_class(**{  # type: ignore
                     k: cvd[state_key].get(k)
                     for k in state_class.__annotations__
                 })
             except KeyError:
                 if attempt < 2:
                     self.load_vehicle_data()
-                else:
-                    raise VehicleDidNotWakeError
 
-        return data
+        raise VehicleDidNotWakeError
 
     def get_vehicle_name(self) -> str:
         return self.get_vehicle_state().vehicle_name
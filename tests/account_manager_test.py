@@ -0,0 +1,97 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import cast
+
+import requests_mock
+
+from tesla_client.account import Account
+from tesla_client.account_manager import AccountManager
+from tesla_client.client import HOST
+from tesla_client.vehicle import Vehicle
+
+
+class FakeAccount(Account):
+    account_id: str
+    token_fetches: int
+
+    def __init__(self, account_id: str) -> None:
+        self.account_id = account_id
+        self.token_fetches = 0
+        super().__init__()
+
+    def get_fresh_access_token(self) -> str:
+        self.token_fetches += 1
+        return 'tOKEN' + self.account_id
+
+
+VEHICLES_JSON = {'response': [{'vin': '5YJ3E1EA7HF000000', 'display_name': 'Red Car', 'state': 'online'}]}
+
+
+class Test_get_account:
+    def test_shares_connection_pool_and_defers_token(self) -> None:
+        manager = AccountManager(FakeAccount)
+
+        a = cast(FakeAccount, manager.get_account('a'))
+        b = manager.get_account('b')
+
+        assert a.client.session is not b.client.session
+        assert a.client.session.get_adapter(HOST) is b.client.session.get_adapter(HOST) is manager.adapter
+        assert a.token_fetches == 0
+
+    def test_evicts_least_recently_used(self) -> None:
+        manager = AccountManager(FakeAccount, max_accounts=2)
+
+        manager.get_account('a')
+        manager.get_account('b')
+        manager.get_account('a')
+        manager.get_account('c')
+
+        assert 'a' in manager
+        assert 'b' not in manager
+        assert len(manager) == 2
+
+    def test_creates_account_outside_lock(self) -> None:
+        manager: AccountManager
+
+        def account_factory(account_id: str) -> FakeAccount:
+            manager.evict('other')
+            return FakeAccount(account_id)
+
+        manager = AccountManager(account_factory)
+
+        assert manager.get_account('a').client.session.get_adapter(HOST) is manager.adapter
+
+
+class Test_get_vehicles:
+    def test_caches_vehicle_list(self) -> None:
+        manager = AccountManager(FakeAccount)
+
+        with requests_mock.Mocker() as m:
+            m.get(f'{HOST}/api/1/vehicles', json=VEHICLES_JSON)
+
+            manager.get_vehicles('a')
+            vehicle = manager.get_vehicle_by_vin('a', '5YJ3E1EA7HF000000')
+
+            assert m.call_count == 1
+            assert m.last_request.headers['Authorization'] == 'Bearer tOKENa'
+            assert vehicle.display_name == 'Red Car'
+
+    def test_refreshes_once_for_concurrent_callers(self) -> None:
+        fetches = 0
+        fetch_lock = threading.Lock()
+
+        class SlowAccount(FakeAccount):
+            def get_vehicles(self) -> list[Vehicle]:
+                nonlocal fetches
+                with fetch_lock:
+                    fetches += 1
+                time.sleep(0.05)
+                return []
+
+        manager = AccountManager(SlowAccount)
+
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(lambda _: manager.get_vehicles('a'), range(8)))
+
+        assert fetches == 1
@@ -0,0 +1,80 @@
+from typing import Any
+
+import mock
+import pytest
+import requests
+
+from tesla_client.simulator import FleetAPISimulator
+from tesla_client.simulator import SimulatedAccount
+from tesla_client.simulator import SimulatorConfig
+from tesla_client.vehicle import make_fleet_telemetry_config
+
+
+CONFIG = make_fleet_telemetry_config('telemetry.example.com', 443, 'CERT', {'Location': {'interval_seconds': 60}})
+
+
+@pytest.fixture
+def simulator():
+    with FleetAPISimulator(SimulatorConfig(vehicle_count=5, asleep_probability=0.0, seed=1)) as sim:
+        yield sim
+
+
+class Test_reconcile_fleet_telemetry:
+    def test_pairs_in_bulk_and_skips_missing_keys(self, simulator: FleetAPISimulator) -> None:
+        account = SimulatedAccount(simulator)
+        vehicles = account.get_vehicles()
+        simulator.vin_to_vehicle[vehicles[0].vin].key_paired = False
+
+        result = account.reconcile_fleet_telemetry(vehicles, {v.vin: CONFIG for v in vehicles})
+
+        assert result.updated_vins == [v.vin for v in vehicles[1:]]
+        assert result.skipped_vins == {vehicles[0].vin: 'missing_key'}
+        assert not vehicles[0].get_fleet_telemetry_status().fleet_telemetry_paired
+        assert vehicles[1].get_fleet_telemetry_status().fleet_telemetry_paired
+
+    def test_only_changes_differing_configs(self, simulator: FleetAPISimulator) -> None:
+        account = SimulatedAccount(simulator)
+        vehicles = account.get_vehicles()
+        account.reconcile_fleet_telemetry(vehicles, {v.vin: CONFIG for v in vehicles})
+
+        desired: dict[str, dict[str, Any] | None] = {v.vin: CONFIG for v in vehicles}
+        desired[vehicles[0].vin] = None
+        result = account.reconcile_fleet_telemetry(vehicles, desired)
+
+        assert result.unpaired_vins == [vehicles[0].vin]
+        assert result.unchanged_vins == [v.vin for v in vehicles[1:]]
+        assert simulator.vin_to_vehicle[vehicles[0].vin].telemetry_config is None
+        assert not vehicles[0].is_using_fleet_telemetry()
+
+    def test_continues_past_failed_requests(self, simulator: FleetAPISimulator) -> None:
+        account = SimulatedAccount(simulator)
+        vehicles = account.get_vehicles()
+        account.reconcile_fleet_telemetry(vehicles[:1], {vehicles[0].vin: CONFIG})
+
+        desired: dict[str, dict[str, Any] | None] = {v.vin: CONFIG for v in vehicles}
+        desired[vehicles[0].vin] = None
+        with mock.patch.object(account.client, 'api_delete', side_effect=requests.ConnectionError):
+            result = account.reconcile_fleet_telemetry(vehicles, desired)
+
+        assert list(result.failed_vins) == [vehicles[0].vin]
+        assert result.updated_vins == [v.vin for v in vehicles[1:]]
+        assert vehicles[0].get_fleet_telemetry_status().fleet_telemetry_paired
+        assert vehicles[1].get_fleet_telemetry_status().fleet_telemetry_paired
+
+    def test_continues_past_failed_config_fetches(self, simulator: FleetAPISimulator) -> None:
+        account = SimulatedAccount(simulator)
+        vehicles = account.get_vehicles()
+        api_get = account.client.api_get
+
+        def failing_api_get(endpoint: str, is_retry: bool = False) -> requests.Response:
+            if endpoint == f'/api/1/vehicles/{vehicles[0].vin}/fleet_telemetry_config':
+                raise requests.ConnectionError
+            return api_get(endpoint, is_retry)
+
+        with mock.patch.object(account.client, 'api_get', side_effect=failing_api_get):
+            result = account.reconcile_fleet_telemetry(vehicles, {v.vin: CONFIG for v in vehicles})
+
+        assert list(result.failed_vins) == [vehicles[0].vin]
+        assert result.updated_vins == [v.vin for v in vehicles[1:]]
+        assert simulator.vin_to_vehicle[vehicles[0].vin].telemetry_config is None
+        assert vehicles[1].get_fleet_telemetry_status().fleet_telemetry_paired
@@ -1,7 +1,11 @@
 import pytest
+import requests
 import requests_mock
 
+from tesla_client.client import CircuitOpenError
 from tesla_client.client import HOST
+from tesla_client.client import RetryPolicy
+from tesla_client.client import ServerError
 from tesla_client.account import Account
 from tesla_client.vehicle import Vehicle
 
@@ -56,3 +60,132 @@ class Test_command:
             )
 
             mock_vehicle.door_lock()
+
+
+@pytest.fixture
+def fast_retry_vehicle():
+    return Vehicle(
+        account=FakeAccount(retry_policy=RetryPolicy(base_delay=0, circuit_failure_threshold=2)),
+        vehicle_json={'vin': VIN, 'display_name': VEHICLE_NAME, 'state': 'online'},
+    )
+
+
+class Test_retry_policy:
+    def test_retries_server_error(self, fast_retry_vehicle: Vehicle) -> None:
+        with requests_mock.Mocker() as m:
+            m.post(
+                f'{HOST}/api/1/vehicles/{VIN}/command/door_lock',
+                response_list=[
+                    {'status_code': 503},
+                    {'json': {'response': {'result': 'true'}}, 'status_code': 200},
+                ],
+            )
+
+            fast_retry_vehicle.door_lock()
+
+            assert m.call_count == 2
+
+    def test_server_error_does_not_wake(self, fast_retry_vehicle: Vehicle) -> None:
+        with requests_mock.Mocker() as m:
+            m.post(f'{HOST}/api/1/vehicles/{VIN}/command/door_lock', status_code=500)
+
+            with pytest.raises(ServerError):
+                fast_retry_vehicle.door_lock()
+
+            assert m.call_count == 1
+            assert all('wake_up' not in r.url for r in m.request_history)
+
+    def test_circuit_opens_for_failing_vehicle(self, fast_retry_vehicle: Vehicle) -> None:
+        with requests_mock.Mocker() as m:
+            m.post(f'{HOST}/api/1/vehicles/{VIN}/command/door_lock', status_code=500)
+
+            for _ in range(2):
+                with pytest.raises(ServerError):
+                    fast_retry_vehicle.door_lock()
+
+            with pytest.raises(CircuitOpenError):
+                fast_retry_vehicle.door_lock()
+
+            assert m.call_count == 2
+
+    def test_success_resets_failure_count(self, fast_retry_vehicle: Vehicle) -> None:
+        with requests_mock.Mocker() as m:
+            m.post(
+                f'{HOST}/api/1/vehicles/{VIN}/command/door_lock',
+                response_list=[
+                    {'status_code': 500},
+                    {'json': {'response': {'result': 'true'}}, 'status_code': 200},
+                    {'status_code': 500},
+                    {'json': {'response': {'result': 'true'}}, 'status_code': 200},
+                ],
+            )
+
+            for _ in range(2):
+                with pytest.raises(ServerError):
+                    fast_retry_vehicle.door_lock()
+                fast_retry_vehicle.door_lock()
+
+            assert m.call_count == 4
+
+    def test_retries_server_error_for_get(self, fast_retry_vehicle: Vehicle) -> None:
+        with requests_mock.Mocker() as m:
+            m.get(
+                f'{HOST}/api/1/vehicles/{VIN}/vehicle_data',
+                response_list=[
+                    {'status_code': 502},
+                    {'json': {'response': {}}, 'status_code': 200},
+                ],
+            )
+
+            fast_retry_vehicle.load_vehicle_data()
+
+            assert m.call_count == 2
+
+    def test_does_not_resend_command_after_read_timeout(self, fast_retry_vehicle: Vehicle) -> None:
+        with requests_mock.Mocker() as m:
+            m.post(f'{HOST}/api/1/vehicles/{VIN}/command/honk_horn', exc=requests.ReadTimeout)
+
+            with pytest.raises(requests.ReadTimeout):
+                fast_retry_vehicle.honk_horn()
+
+            assert m.call_count == 1
+
+    def test_resends_command_after_connect_timeout(self, fast_retry_vehicle: Vehicle) -> None:
+        with requests_mock.Mocker() as m:
+            m.post(
+                f'{HOST}/api/1/vehicles/{VIN}/command/honk_horn',
+                response_list=[
+                    {'exc': requests.ConnectTimeout},
+                    {'json': {'response': {'result': 'true'}}, 'status_code': 200},
+                ],
+            )
+
+            fast_retry_vehicle.honk_horn()
+
+            assert m.call_count == 2
+
+    def test_retries_read_timeout_for_get(self, fast_retry_vehicle: Vehicle) -> None:
+        with requests_mock.Mocker() as m:
+            m.get(
+                f'{HOST}/api/1/vehicles/{VIN}/vehicle_data',
+                response_list=[
+                    {'exc': requests.ReadTimeout},
+                    {'json': {'response': {}}, 'status_code': 200},
+                ],
+            )
+
+            fast_retry_vehicle.load_vehicle_data()
+
+            assert m.call_count == 2
+
+    def test_caps_attempt_timeout_to_deadline(self) -> None:
+        vehicle = Vehicle(
+            account=FakeAccount(retry_policy=RetryPolicy(deadline=5, request_timeout=30)),
+            vehicle_json={'vin': VIN, 'display_name': VEHICLE_NAME, 'state': 'online'},
+        )
+        with requests_mock.Mocker() as m:
+            m.get(f'{HOST}/api/1/vehicles/{VIN}/vehicle_data', json={'response': {}})
+
+            vehicle.load_vehicle_data()
+
+            assert 0 < m.request_history[0].timeout <= 5
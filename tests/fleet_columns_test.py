@@ -0,0 +1,47 @@
+import pytest
+
+from tesla_client.fleet_columns import FleetColumns
+
+
+def make_columns() -> FleetColumns:
+    columns = FleetColumns()
+    columns.update('A', {'charge_state': {'battery_level': 15, 'charging_state': 'Disconnected'}})
+    columns.update('B', {'charge_state': {'battery_level': 10, 'charging_state': 'Charging'}})
+    columns.update('C', {'charge_state': {'battery_level': 80, 'charging_state': 'Complete'}})
+    columns.update('D', {'vehicle_state': {'locked': True}})
+    return columns
+
+
+class Test_select:
+    def test_filters_on_all_conditions(self) -> None:
+        columns = make_columns()
+
+        assert columns.select(('battery_level', '<', 20), ('charging_state', '!=', 'Charging')) == ['A']
+
+    def test_sees_updates_in_place(self) -> None:
+        columns = make_columns()
+        columns.update('C', {'charge_state': {'battery_level': 5, 'charging_state': 'Stopped'}})
+
+        assert columns.select(('battery_level', '<', 20)) == ['A', 'B', 'C']
+        assert columns.get('C', 'charging_state') == 'Stopped'
+
+    def test_rejects_ordering_strings(self) -> None:
+        with pytest.raises(ValueError):
+            make_columns().select(('charging_state', '<', 'Charging'))
+
+
+class Test_aggregate:
+    def test_skips_missing_values(self) -> None:
+        columns = make_columns()
+
+        assert columns.aggregate('battery_level', 'mean') == 35
+        assert columns.aggregate('locked', 'count') == 1
+        assert columns.aggregate('battery_level', 'max', where=[('charging_state', '==', 'Charging')]) == 10
+
+
+class Test_top_k:
+    def test_orders_values(self) -> None:
+        columns = make_columns()
+        columns.remove('A')
+
+        assert columns.top_k('battery_level', 2, largest=False) == [('B', 10), ('C', 80)]
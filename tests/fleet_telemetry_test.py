@@ -0,0 +1,133 @@
+import mock
+import pytest
+import requests_mock
+
+from tesla_client.account import Account
+from tesla_client.client import HOST
+from tesla_client.fleet_columns import FleetColumns
+from tesla_client.geofence import Geofence
+from tesla_client.geofence import GeofenceEngine
+from tesla_client.vehicle import Vehicle
+from tesla_client.vehicle_data_pb2 import Datum  # type: ignore
+from tesla_client.vehicle_data_pb2 import Field  # type: ignore
+from tesla_client.vehicle_data_pb2 import LocationValue  # type: ignore
+from tesla_client.vehicle_data_pb2 import Payload  # type: ignore
+from tesla_client.vehicle_data_pb2 import Value  # type: ignore
+
+try:
+    from tesla_client.fleet_telemetry import FleetTelemetryListener
+except SyntaxError:
+    # kafka 1.x uses async as an identifier, which Python 3.7+ rejects
+    pytest.skip('kafka does not import on this Python version', allow_module_level=True)
+
+
+VINS = ['5YJ3E1EA7HF000000', '5YJ3E1EA7HF000001']
+
+DEPOT = Geofence('depot', latitude=37.4, longitude=-122.1, radius_meters=200)
+
+
+class FakeAccount(Account):
+    def get_fresh_access_token(self) -> str:
+        return 'aCCESStOKEN'
+
+
+class StopListening(Exception):
+    pass
+
+
+def make_listener(**kwargs) -> FleetTelemetryListener:
+    account = FakeAccount()
+    vehicles = [Vehicle(account, {'vin': vin, 'display_name': vin, 'state': 'online'}) for vin in VINS]
+
+    with requests_mock.Mocker() as m:
+        for vin in VINS:
+            m.get(
+                f'{HOST}/api/1/vehicles/{vin}/vehicle_data',
+                json={'response': {'drive_state': {'latitude': 0.0, 'longitude': 0.0}}},
+            )
+        return FleetTelemetryListener(vehicles, 'localhost:9092', 'group', **kwargs)
+
+
+def make_location_payload(vin: str, latitude: float, longitude: float) -> Payload:
+    return Payload(vin=vin, data=[
+        Datum(key=Field.Location, value=Value(location_value=LocationValue(latitude=latitude, longitude=longitude))),
+    ])
+
+
+class Test_listen:
+    def test_evaluates_geofences_once_per_batch(self) -> None:
+        engine = GeofenceEngine([DEPOT])
+        consumer = mock.Mock()
+        listener = make_listener(geofence_engine=engine, vehicle_consumer=consumer)
+        consumer.poll.side_effect = [
+            {'partition': [
+                mock.Mock(value=make_location_payload(vin, 37.4, -122.1).SerializeToString())
+                for vin in VINS
+            ]},
+            StopListening,
+        ]
+
+        with mock.patch.object(engine, 'evaluate', wraps=engine.evaluate) as evaluate:
+            with mock.patch.object(listener, 'notify_vehicle_data_changed') as notify:
+                with pytest.raises(StopListening):
+                    listener.listen()
+
+        assert evaluate.call_count == 1
+        notify.assert_has_calls([mock.call(vin, 'geofence', 'depot', False, True) for vin in VINS], any_order=True)
+
+    def test_survives_recorder_errors(self) -> None:
+        recorder = mock.Mock()
+        recorder.append.side_effect = OSError('disk full')
+        consumer = mock.Mock()
+        listener = make_listener(recorder=recorder, vehicle_consumer=consumer)
+        consumer.poll.side_effect = [
+            {'partition': [mock.Mock(value=make_location_payload(VINS[0], 37.4, -122.1).SerializeToString())]},
+            StopListening,
+        ]
+
+        with pytest.raises(StopListening):
+            listener.listen()
+
+        assert listener.vin_to_vehicle[VINS[0]].get_drive_state().latitude == 37.4
+
+    def test_requires_bootstrap_server_without_consumer(self) -> None:
+        listener = FleetTelemetryListener([], load_vehicles=False)
+
+        with pytest.raises(ValueError):
+            listener.listen()
+
+
+class Test_handle_vehicle_message:
+    def test_fills_empty_fleet_columns(self) -> None:
+        columns = FleetColumns()
+        listener = make_listener(fleet_columns=columns)
+
+        listener.handle_vehicle_message(make_location_payload(VINS[0], 37.4, -122.1))
+
+        assert len(columns) == 2
+        assert columns.get(VINS[0], 'latitude') == 37.4
+        assert columns.get(VINS[1], 'latitude') == 0.0
+
+    def test_shares_sections_the_message_does_not_change(self) -> None:
+        listener = make_listener()
+        vehicle = listener.vin_to_vehicle[VINS[0]]
+        vehicle.set_cached_vehicle_data({**vehicle.get_cached_vehicle_data(), 'charge_state': {'battery_level': 50}})
+        before = vehicle.get_cached_vehicle_data()
+
+        listener.handle_vehicle_message(make_location_payload(VINS[0], 37.4, -122.1))
+
+        after = vehicle.get_cached_vehicle_data()
+        assert after['charge_state'] is before['charge_state']
+        assert after['drive_state'] is not before['drive_state']
+        assert 'climate_state' not in after
+
+    def test_handles_without_kafka_or_startup_loading(self) -> None:
+        vehicle = Vehicle(FakeAccount(), {'vin': VINS[0], 'display_name': VINS[0], 'state': 'online'})
+        vehicle.set_cached_vehicle_data({'last_load_from_api': 1})
+
+        with requests_mock.Mocker():
+            listener = FleetTelemetryListener([vehicle], load_vehicles=False)
+            listener.handle_vehicle_message(make_location_payload(VINS[0], 37.4, -122.1))
+
+        assert listener.vehicle_consumer is None
+        assert vehicle.get_cached_vehicle_data()['drive_state']['latitude'] == 37.4
@@ -0,0 +1,34 @@
+from tesla_client.geofence import Geofence
+from tesla_client.geofence import GeofenceEngine
+from tesla_client.geofence import GeofenceEvent
+
+
+DEPOT = Geofence('depot', latitude=37.4, longitude=-122.1, radius_meters=200)
+YARD = Geofence('yard', polygon=((37.0, -122.0), (37.0, -121.9), (37.1, -121.9), (37.1, -122.0)))
+
+
+class Test_contains_points:
+    def test_circle(self) -> None:
+        # ~110m and ~330m north of the center
+        assert DEPOT.contains_points([(37.401, -122.1), (37.403, -122.1)]) == [True, False]
+
+    def test_polygon(self) -> None:
+        assert YARD.contains_points([(37.05, -121.95), (37.05, -121.85)]) == [True, False]
+
+
+class Test_evaluate:
+    def test_emits_enter_and_exit(self) -> None:
+        engine = GeofenceEngine([DEPOT, YARD], cell_size_degrees=0.01)
+
+        entered = engine.evaluate([('A', 37.4, -122.1), ('B', 37.05, -121.95), ('C', 0.0, 0.0)])
+        exited = engine.evaluate([('A', 38.0, -122.1), ('B', 37.05, -121.95)])
+
+        assert entered == [GeofenceEvent('A', 'depot', True), GeofenceEvent('B', 'yard', True)]
+        assert exited == [GeofenceEvent('A', 'depot', False)]
+        assert engine.get_geofence_names('B') == {'yard'}
+
+    def test_removed_geofence_no_longer_matches(self) -> None:
+        engine = GeofenceEngine([DEPOT])
+        engine.remove('depot')
+
+        assert engine.evaluate([('A', 37.4, -122.1)]) == []
@@ -0,0 +1,52 @@
+import mock
+import pytest
+
+from tesla_client.client import VehicleAsleepError
+from tesla_client.simulator import FleetAPISimulator
+from tesla_client.simulator import SimulatedAccount
+from tesla_client.simulator import SimulatorConfig
+from tesla_client.vehicle_data_pb2 import Field  # type: ignore
+from tesla_client.vehicle_data_pb2 import Payload  # type: ignore
+
+
+@pytest.fixture
+def simulator():
+    with FleetAPISimulator(SimulatorConfig(vehicle_count=20, asleep_probability=1.0, wake_delay=(0, 0), seed=1)) as sim:
+        yield sim
+
+
+class Test_get_vehicles:
+    def test_lists_all_vehicles(self, simulator: FleetAPISimulator) -> None:
+        vehicles = SimulatedAccount(simulator).get_vehicles()
+        assert {v.vin for v in vehicles} == set(simulator.vin_to_vehicle)
+
+    def test_refreshes_expired_token(self, simulator: FleetAPISimulator) -> None:
+        account = SimulatedAccount(simulator)
+        simulator.expire_token(account.client.access_token)
+        assert len(account.get_vehicles()) == 20
+
+
+class Test_load_vehicle_data:
+    def test_asleep_vehicle_raises_without_wake(self, simulator: FleetAPISimulator) -> None:
+        vehicle = SimulatedAccount(simulator).get_vehicles()[0]
+        with pytest.raises(VehicleAsleepError):
+            vehicle.load_vehicle_data(should_wake=False)
+
+    def test_wakes_asleep_vehicle(self, simulator: FleetAPISimulator) -> None:
+        vehicle = SimulatedAccount(simulator).get_vehicles()[0]
+        with mock.patch('tesla_client.vehicle.time.sleep'):
+            vehicle.load_vehicle_data()
+        assert vehicle.get_vehicle_state().vehicle_name == vehicle.display_name
+
+
+class Test_emit_telemetry:
+    def test_emits_configured_fields_for_online_vehicles(self, simulator: FleetAPISimulator) -> None:
+        vehicle = SimulatedAccount(simulator).get_vehicles()[0]
+        with mock.patch('tesla_client.vehicle.time.sleep'):
+            vehicle.wake_up()
+        vehicle._pair_fleet_telemetry('localhost', 443, 'CERT', fields={'BatteryLevel': {'interval_seconds': 60}})
+
+        assert simulator.emit_telemetry() == 1
+        payload = Payload.FromString(simulator.telemetry_queue.get_nowait())
+        assert payload.vin == vehicle.vin
+        assert [datum.key for datum in payload.data] == [Field.BatteryLevel]
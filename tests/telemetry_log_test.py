@@ -0,0 +1,73 @@
+from pathlib import Path
+
+import mock
+
+from tesla_client.telemetry_log import Segment
+from tesla_client.telemetry_log import TelemetryLogReader
+from tesla_client.telemetry_log import TelemetryRecorder
+from tesla_client.vehicle_data_pb2 import Payload  # type: ignore
+
+
+VIN_A = '5YJ3E1EA7HF000000'
+VIN_B = '5YJ3E1EA7HF000001'
+
+
+class FakeListener:
+    def __init__(self) -> None:
+        self.payloads: list[Payload] = []
+
+    def handle_vehicle_message(self, payload: Payload) -> None:
+        self.payloads.append(payload)
+
+
+def record(directory: Path) -> None:
+    # a tiny segment size puts every record in its own segment
+    with TelemetryRecorder(str(directory), max_segment_bytes=1) as recorder:
+        for i, vin in enumerate([VIN_A, VIN_B, VIN_A, VIN_B]):
+            recorder.append(Payload(vin=vin).SerializeToString(), vin, timestamp_ns=(i + 1) * 10**9)
+
+
+class Test_read:
+    def test_filters_by_vin_and_time(self, tmp_path: Path) -> None:
+        record(tmp_path)
+
+        with TelemetryLogReader(str(tmp_path)) as reader:
+            assert len(reader.segments) == 4
+            assert [ts for ts, raw in reader.read(vins={VIN_A})] == [1 * 10**9, 3 * 10**9]
+            assert [ts for ts, raw in reader.read(start=2, end=4)] == [2 * 10**9, 3 * 10**9]
+
+    def test_skips_segments_without_requested_vins(self, tmp_path: Path) -> None:
+        record(tmp_path)
+
+        with TelemetryLogReader(str(tmp_path)) as reader:
+            assert [segment.vins for segment in reader.segments] == [{VIN_A}, {VIN_B}, {VIN_A}, {VIN_B}]
+            with mock.patch.object(Segment, 'get_entry', autospec=True, side_effect=Segment.get_entry) as get_entry:
+                assert len(list(reader.read(vins={VIN_A}))) == 2
+            assert get_entry.call_count == 2
+
+    def test_reads_vins_from_index_without_sidecar(self, tmp_path: Path) -> None:
+        record(tmp_path)
+        (tmp_path / '00000001.vins').unlink()
+
+        with TelemetryLogReader(str(tmp_path)) as reader:
+            assert reader.segments[1].vins == {VIN_B}
+            assert [ts for ts, raw in reader.read(vins={VIN_B})] == [2 * 10**9, 4 * 10**9]
+
+    def test_ignores_torn_record(self, tmp_path: Path) -> None:
+        record(tmp_path)
+        with open(tmp_path / '00000003.seg', 'r+b') as f:
+            f.truncate(5)
+
+        with TelemetryLogReader(str(tmp_path)) as reader:
+            assert len(list(reader.read())) == 3
+
+
+class Test_replay:
+    def test_feeds_listener(self, tmp_path: Path) -> None:
+        record(tmp_path)
+
+        listener = FakeListener()
+        with TelemetryLogReader(str(tmp_path)) as reader:
+            assert reader.replay(listener, vins={VIN_B}) == 2
+
+        assert [p.vin for p in listener.payloads] == [VIN_B, VIN_B]
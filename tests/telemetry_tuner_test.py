@@ -0,0 +1,105 @@
+import requests_mock
+
+from tesla_client.account import Account
+from tesla_client.client import HOST
+from tesla_client.telemetry_tuner import TelemetryTuner
+from tesla_client.vehicle import Vehicle
+from tesla_client.vehicle_data_pb2 import Datum  # type: ignore
+from tesla_client.vehicle_data_pb2 import Field  # type: ignore
+from tesla_client.vehicle_data_pb2 import HvacPowerState  # type: ignore
+from tesla_client.vehicle_data_pb2 import Payload  # type: ignore
+from tesla_client.vehicle_data_pb2 import Value  # type: ignore
+
+
+FIELDS = {
+    'HvacPower': {'interval_seconds': 1},
+    'Location': {'interval_seconds': 60, 'minimum_delta': 100},
+}
+
+
+class FakeAccount(Account):
+    def get_fresh_access_token(self) -> str:
+        return 'aCCESStOKEN'
+
+
+def make_vehicle(account: Account, vin: str, shift_state: str) -> Vehicle:
+    vehicle = Vehicle(account, {'vin': vin, 'display_name': vin, 'state': 'online'})
+    vehicle.set_cached_vehicle_data({'drive_state': {'shift_state': shift_state}})
+    return vehicle
+
+
+def make_hvac_payload(vin: str, state: int) -> Payload:
+    return Payload(vin=vin, data=[Datum(key=Field.HvacPower, value=Value(hvac_power_value=state))])
+
+
+def make_tuner() -> TelemetryTuner:
+    return TelemetryTuner('telemetry.example.com', 443, 'CERT', fields=FIELDS, min_messages=3)
+
+
+class Test_observe:
+    def test_ignores_unknown_fields(self) -> None:
+        tuner = make_tuner()
+        tuner.observe(Payload(vin='A', data=[
+            Datum(key=9999, value=Value(int_value=1)),
+            Datum(key=Field.HvacPower, value=Value(hvac_power_value=HvacPowerState.HvacPowerStateOff)),
+        ]))
+
+        assert list(tuner._vin_to_field_stats['A']) == ['HvacPower']
+
+
+class Test_compute_fields:
+    def test_slows_redundant_fields(self) -> None:
+        tuner = make_tuner()
+        for _ in range(5):
+            tuner.observe(Payload(vin='A', data=[
+                Datum(key=Field.HvacPower, value=Value(hvac_power_value=HvacPowerState.HvacPowerStateOff)),
+            ]))
+
+        fields = tuner.compute_fields(make_vehicle(FakeAccount(), 'A', 'P'))
+
+        assert fields['HvacPower'] == {'interval_seconds': 10}
+        assert fields['Location'] == FIELDS['Location']
+
+    def test_speeds_up_location_while_driving(self) -> None:
+        fields = make_tuner().compute_fields(make_vehicle(FakeAccount(), 'A', 'D'))
+
+        assert fields['Location'] == {'interval_seconds': 10, 'minimum_delta': 100}
+
+
+class Test_tune:
+    def test_batches_changed_vins(self) -> None:
+        account = FakeAccount()
+        tuner = make_tuner()
+        vehicles = [make_vehicle(account, vin, shift_state) for vin, shift_state in [('A', 'D'), ('B', 'D'), ('C', 'P')]]
+
+        with requests_mock.Mocker() as m:
+            m.post(f'{HOST}/api/1/vehicles/fleet_telemetry_config', json={'response': {'updated_vehicles': 2}})
+
+            assert tuner.tune(vehicles) == ['A', 'B']
+            assert tuner.tune(vehicles) == []
+
+            assert m.call_count == 1
+            assert m.last_request.json()['vins'] == ['A', 'B']
+
+    def test_keeps_slowdown_until_value_changes(self) -> None:
+        account = FakeAccount()
+        tuner = make_tuner()
+        vehicle = make_vehicle(account, 'A', 'P')
+
+        with requests_mock.Mocker() as m:
+            m.post(f'{HOST}/api/1/vehicles/fleet_telemetry_config', json={'response': {'updated_vehicles': 1}})
+
+            for _ in range(5):
+                tuner.observe(make_hvac_payload('A', HvacPowerState.HvacPowerStateOff))
+            assert tuner.tune([vehicle]) == ['A']
+
+            # too few messages at the slower interval to count as redundant again
+            tuner.observe(make_hvac_payload('A', HvacPowerState.HvacPowerStateOff))
+            assert tuner.tune([vehicle]) == []
+            assert tuner.get_applied_fields('A')['HvacPower'] == {'interval_seconds': 10}
+
+            tuner.observe(make_hvac_payload('A', HvacPowerState.HvacPowerStateOn))
+            assert tuner.tune([vehicle]) == ['A']
+            assert tuner.get_applied_fields('A')['HvacPower'] == {'interval_seconds': 1}
+
+            assert m.call_count == 2
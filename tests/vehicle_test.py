@@ -0,0 +1,112 @@
+import json
+import threading
+
+import pytest
+
+from tesla_client.account import Account
+from tesla_client.vehicle import Vehicle
+
+
+VIN = '5YJ3E1EA7HF000000'
+
+
+class FakeAccount(Account):
+    def get_fresh_access_token(self) -> str:
+        return 'aCCESStOKEN'
+
+
+def make_vehicle() -> Vehicle:
+    return Vehicle(
+        account=FakeAccount(),
+        vehicle_json={'vin': VIN, 'display_name': 'Red Car', 'state': 'online'},
+    )
+
+
+class Test_set_cached_vehicle_data:
+    def test_swaps_versioned_snapshot(self) -> None:
+        vehicle = make_vehicle()
+        vehicle.set_cached_vehicle_data({'charge_state': {'battery_level': 50}})
+        before = vehicle.get_snapshot()
+
+        vehicle.set_cached_vehicle_data({'charge_state': {'battery_level': 60}})
+
+        assert before.version == 1
+        assert before.data['charge_state']['battery_level'] == 50
+        assert vehicle.get_snapshot().version == 2
+        assert vehicle.get_charge_state().battery_level == 60
+
+    def test_rejects_stale_expected_version(self) -> None:
+        vehicle = make_vehicle()
+        vehicle.set_cached_vehicle_data({'charge_state': {'battery_level': 50}})
+
+        assert not vehicle.set_cached_vehicle_data({'charge_state': {'battery_level': 60}}, expected_version=0)
+        assert vehicle.set_cached_vehicle_data({'charge_state': {'battery_level': 70}}, expected_version=1)
+        assert vehicle.get_charge_state().battery_level == 70
+
+    def test_data_is_read_only(self) -> None:
+        vehicle = make_vehicle()
+        vehicle.set_cached_vehicle_data({'charge_state': {'battery_level': 50}})
+
+        with pytest.raises(TypeError):
+            vehicle.get_cached_vehicle_data()['charge_state']['battery_level'] = 60  # type: ignore
+
+    def test_lists_are_read_only(self) -> None:
+        vehicle = make_vehicle()
+        vehicle.set_cached_vehicle_data({'vehicle_config': {'wheels': [{'size': 19}]}})
+
+        wheels = vehicle.get_cached_vehicle_data()['vehicle_config']['wheels']
+        assert wheels == ({'size': 19},)
+        with pytest.raises(TypeError):
+            wheels[0]['size'] = 20
+
+
+class Test_to_dict:
+    def test_returns_plain_copy(self) -> None:
+        vehicle = make_vehicle()
+        vehicle_data = {'vehicle_config': {'wheels': [{'size': 19}]}, 'last_update': 1}
+        vehicle.set_cached_vehicle_data(vehicle_data)
+
+        copy = vehicle.get_snapshot().to_dict()
+        copy['vehicle_config']['wheels'].append({'size': 20})
+
+        assert json.loads(json.dumps(vehicle.get_snapshot().to_dict())) == vehicle_data
+        assert len(vehicle.get_cached_vehicle_data()['vehicle_config']['wheels']) == 1
+
+
+class Test_update_cached_vehicle_data:
+    def test_reapplies_on_top_of_concurrent_write(self) -> None:
+        vehicle = make_vehicle()
+        vehicle.set_cached_vehicle_data({'charge_state': {'battery_level': 50}})
+        calls = 0
+
+        def update(data):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                # another writer gets in between our read and our write
+                vehicle.set_cached_vehicle_data({**data, 'vehicle_state': {'locked': True}})
+            return {**data, 'climate_state': {'inside_temp': 20.0}}
+
+        before, after = vehicle.update_cached_vehicle_data(update)
+
+        assert calls == 2
+        assert before.version == 2
+        assert after.version == 3
+        assert after.data['vehicle_state']['locked'] is True
+        assert after.data['climate_state']['inside_temp'] == 20.0
+
+
+class Test_wait_for_version:
+    def test_wakes_on_update(self) -> None:
+        vehicle = make_vehicle()
+        timer = threading.Timer(0.01, vehicle.set_cached_vehicle_data, [{'vehicle_state': {'locked': True}}])
+        timer.start()
+
+        snapshot = vehicle.wait_for_version(0, timeout=5)
+
+        assert snapshot is not None
+        assert snapshot.version == 1
+        assert snapshot.data['vehicle_state']['locked'] is True
+
+    def test_times_out(self) -> None:
+        assert make_vehicle().wait_for_version(0, timeout=0.01) is None